@@ -1,14 +1,95 @@
 import duckdb
-import pandas as pd
+import threading
 from typing import Any, List, Dict
 from datetime import datetime
+from connection_pool import PoolMetrics
+from schema_catalog import default_catalog
+from index_advisor import IndexAdvisor
+from sql_filters import filter_conditions, quote_identifier
+
+
+class DuckDBCursorPool:
+    """
+    Hands out one DuckDB cursor per thread, all opened off a single database instance.
+
+    Cursors are keyed by thread; a cursor whose thread has exited is closed and
+    checked back in the next time the pool is used, so worker pools that come
+    and go do not leak cursors.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.metrics = PoolMetrics()
+        self._lock = threading.Lock()
+        self._cursors: Dict[int, tuple] = {}
+
+    def cursor(self):
+        """Return the calling thread's cursor, creating it on first use."""
+        thread = threading.current_thread()
+        with self._lock:
+            entry = self._cursors.get(thread.ident)
+            if entry is not None and entry[0] is thread:
+                self.metrics.record_reuse()
+                return entry[1]
+            self._reap()
+            cursor = self.conn.cursor()
+            self._cursors[thread.ident] = (thread, cursor)
+        # A thread keeps its cursor for its lifetime, so each one counts as in use.
+        self.metrics.record_connect()
+        self.metrics.record_checkout()
+        return cursor
+
+    def _reap(self):
+        # Caller holds self._lock.
+        for ident, (thread, cursor) in list(self._cursors.items()):
+            if thread.is_alive():
+                continue
+            del self._cursors[ident]
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            self.metrics.record_checkin()
+
+    def reap(self) -> int:
+        """Close the cursors of threads that have exited; return how many are still open."""
+        with self._lock:
+            self._reap()
+            return len(self._cursors)
+
+    def close(self):
+        with self._lock:
+            for _, cursor in self._cursors.values():
+                cursor.close()
+                self.metrics.record_checkin()
+            self._cursors = {}
+
+
 class DuckDBLoader:
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(self, db_path: str = ":memory:", catalog=None):
         """
         Initialize DuckDBLoader with an in-memory or file-based DuckDB instance.
+        Each thread queries through its own cursor off the shared connection.
         """
         self.conn = duckdb.connect(database=db_path)
+        self.catalog = catalog or default_catalog
+        self.advisor = IndexAdvisor("duckdb", cursor_factory=self.cursor)
+        self.catalog_key = db_path if db_path != ":memory:" else f":memory:{id(self.conn)}"
+        self.pool = DuckDBCursorPool(self.conn)
         self.logger = None  
+
+    def cursor(self):
+        """Return a cursor owned by the calling thread."""
+        return self.pool.cursor()
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Return cursor pool metrics, after releasing cursors of finished threads."""
+        self.pool.reap()
+        return self.pool.metrics.snapshot()
+
+    def close(self):
+        self.pool.close()
+        self.conn.close()
     
     def load_data(
         self,
@@ -27,11 +108,26 @@ class DuckDBLoader:
         log_statement: bool = False,
         log_sample_values: bool = False,
         pretty_print: bool = True,
+        partition: Dict[str, Any] = None,
     ) -> List[Dict[str, Any]]:
         """
         Load data from a DuckDB database with filtering, sorting, and grouping.
+
+        `partition` restricts the scan to one disjoint slice of the table, see
+        `parallel_scan.parallel_load_data`.
         """
-        query = f"SELECT * FROM {model}"
+        # Filters and the partition go into the source, so time_bucket,
+        # only_latest and group_by below see the same filtered rows.
+        conditions, params = filter_conditions(filters, convert=self._param)
+        if partition:
+            clause, partition_params = self._partition_clause(partition)
+            conditions.append(clause)
+            params.extend(partition_params)
+        source = model
+        if conditions:
+            source = f"(SELECT * FROM {model} WHERE {' AND '.join(conditions)}) AS _src"
+
+        query = f"SELECT * FROM {source}"
         
         if selected_columns_or_path:
             columns = []
@@ -41,31 +137,7 @@ class DuckDBLoader:
                 elif isinstance(item, tuple):
                     col_name, func = item
                     columns.append(f"{func}({col_name})")
-            query = f"SELECT {', '.join(columns)} FROM {model}"
-        
-        if filters:
-            conditions = []
-            for column, value in filters.items():
-                if isinstance(value, list):  
-                    conditions.append(f"{column} IN ({', '.join(map(str, value))})")
-                elif isinstance(value, dict):  
-                    for op, val in value.items():
-                        if op == "==":
-                            conditions.append(f"{column} = {val}")
-                        elif op == "!=":
-                            conditions.append(f"{column} != {val}")
-                        elif op == ">":
-                            conditions.append(f"{column} > {val}")
-                        elif op == ">=":
-                            conditions.append(f"{column} >= {val}")
-                        elif op == "<":
-                            conditions.append(f"{column} < {val}")
-                        elif op == "<=":
-                            conditions.append(f"{column} <= {val}")
-                else: 
-                    conditions.append(f"{column} = {value}")
-
-            query += " WHERE " + " AND ".join(conditions)
+            query = f"SELECT {', '.join(columns)} FROM {source}"
         
         if time_bucket:
             bucket_interval = time_bucket.get("bucket_interval")  
@@ -76,7 +148,7 @@ class DuckDBLoader:
                 SELECT DISTINCT 
                     time_bucket(INTERVAL '{bucket_interval}', CAST({bucket_timestamp} AS TIMESTAMP)) AS time_bucket,
                     {distinct_column}
-                FROM {model}
+                FROM {source}
             """
         
         if only_latest:
@@ -86,25 +158,25 @@ class DuckDBLoader:
             query = f"""
                 SELECT * FROM (
                     SELECT *, ROW_NUMBER() OVER (PARTITION BY {latest_on_column} ORDER BY {timestamp_column} DESC) AS rn
-                    FROM {model}
+                    FROM {source}
                 ) WHERE rn = 1
             """
         
         if distinct:
-            query = query.replace("SELECT *", "SELECT DISTINCT *")
+            query = query.replace("SELECT *", "SELECT DISTINCT *", 1)
         
         if group_by:
             group_by_clause = ", ".join(group_by)
 
            
-            result = self.conn.execute(f"PRAGMA table_info('ship_data')").fetchall()
-            all_columns = [row[1] for row in result]  
+            schema = self.catalog.duckdb_describe(self.cursor(), self.catalog_key, model)
+            all_columns = self.catalog.columns(schema)
             updated_columns = [
                 col if col in group_by else f"ANY_VALUE({col}) AS {col}"
                 for col in all_columns
             ]
             
-            query = f"SELECT {', '.join(updated_columns)} FROM ship_data GROUP BY {group_by_clause}"
+            query = f"SELECT {', '.join(updated_columns)} FROM {source} GROUP BY {group_by_clause}"
 
 
 
@@ -118,17 +190,49 @@ class DuckDBLoader:
         if offset:
             query += f" OFFSET {offset}"
         
+        self.advisor.record(
+            model, (query, params), filters=filters, order_by=order_by, order=order,
+            only_latest=only_latest, group_by=group_by,
+        )
+
         if log_statement:
             print(f"Executing Query: {query}")
         
         try:
-            result_df = self.conn.execute(query).fetchdf()
+            result_df = self.cursor().execute(query, params).fetchdf()
             return result_df.to_dict("records")
         except Exception as e:
             print(f"Error executing query: {query}, Error: {str(e)}")
             raise
     
 
+    @staticmethod
+    def _param(value: Any) -> Any:
+        """Bind datetimes as text, the format `timestamp_updated` is stored in."""
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        return value
+
+    @classmethod
+    def _partition_clause(cls, partition: Dict[str, Any]):
+        """Return (condition, parameters) restricting the scan to `partition`."""
+        column = quote_identifier(partition["column"])
+        if "modulus" in partition:
+            return f"hash({column}) % ? = ?", [int(partition["modulus"]), int(partition["remainder"])]
+        conditions, params = [], []
+        if partition.get("lower") is not None:
+            conditions.append(f"{column} >= ?")
+            params.append(cls._param(partition["lower"]))
+        if partition.get("upper") is not None:
+            conditions.append(f"{column} < ?")
+            params.append(cls._param(partition["upper"]))
+        return " AND ".join(conditions) or "TRUE", params
+
+    def column_bounds(self, model: str, column: str):
+        """Return (min, max) of `column`, used to plan range partitions."""
+        column = quote_identifier(column)
+        return tuple(self.cursor().execute(f"SELECT MIN({column}), MAX({column}) FROM {model}").fetchone())
+
     def upsert_data(self, table_name, data, id_fields, unique_fields, no_update_cols=None, return_counts=False):
         """
         Upserts data into DuckDB table with an additional check for unique fields.
@@ -155,7 +259,7 @@ class DuckDBLoader:
 
           
             existing_records = {}
-            cursor = self.conn.cursor()
+            cursor = self.cursor()
 
             for record in data:
                 unique_filter = " AND ".join([f"{col} = ?" for col in unique_fields])
@@ -193,8 +297,13 @@ class DuckDBLoader:
             columns = ", ".join(final_data[0].keys())
             query = f"INSERT OR REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
 
-            with self.conn:
+            cursor.begin()
+            try:
                 cursor.executemany(query, [tuple(record.values()) for record in final_data])
+                cursor.commit()
+            except Exception:
+                cursor.rollback()
+                raise
 
             return {"success": True, "inserted_rows": len(final_data), "updated_rows": len(final_data)}
 
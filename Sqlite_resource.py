@@ -1,5 +1,3 @@
-import sqlite3
-import pandas as pd
 from typing import Any, List, Dict
 from decimal import Decimal
 from sqlalchemy import create_engine, desc, asc
@@ -12,14 +10,45 @@ import re
 from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
+from schema_catalog import default_catalog
+from index_advisor import IndexAdvisor
+from connection_pool import create_pooled_engine, is_memory_url, timed_session
+from sql_filters import filter_clause
 
 class SQLiteLoader:
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        prewarm: bool = True,
+        catalog=None,
+    ):
         """
         Initialize SQLiteLoader with an in-memory or file-based SQLite database.
+
+        Writes go through a pooled engine; `load_data` reads through a second,
+        read-only pool so concurrent readers never take the write lock.
         """
-        self.engine = create_engine(db_path)
+        pool_kwargs = dict(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout, prewarm=prewarm)
+        self.engine, self.write_metrics = create_pooled_engine(db_path, **pool_kwargs)
+        if is_memory_url(db_path):
+            self.read_engine, self.read_metrics = self.engine, self.write_metrics
+        else:
+            self.read_engine, self.read_metrics = create_pooled_engine(db_path, read_only=True, **pool_kwargs)
         self.Session = sessionmaker(bind=self.engine)
+        self.ReadSession = sessionmaker(bind=self.read_engine)
+        self.catalog = catalog or default_catalog
+        self.advisor = IndexAdvisor("sqlite", read_engine=self.read_engine, write_engine=self.engine)
+
+    def table(self, table_name: str) -> Table:
+        """Return the cached Table for `table_name`, reflecting only that table on first use."""
+        return self.catalog.table(self.read_engine, table_name)
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Return read and write pool metrics."""
+        return {"read": self.read_metrics.snapshot(), "write": self.write_metrics.snapshot()}
     
     def load_data(
     self,
@@ -39,12 +68,28 @@ class SQLiteLoader:
     log_statement: bool = False,
     log_sample_values: bool = False,
     pretty_print: bool = True,
+    partition: dict = None,
 ) -> List[Dict[str, Any]]:
         """
         Load data from an SQLite database with filtering, sorting, and grouping.
+
+        `partition` restricts the scan to one disjoint slice of the table, see
+        `parallel_scan.parallel_load_data`.
         """
-        session = self.Session()
-        query = session.query(model)  
+        with timed_session(self.ReadSession, self.read_metrics) as session:
+            results = self._run_query(
+                session, model, filters, selected_columns_or_path, limit, group_by,
+                order_by, order, offset, time_bucket, only_latest, partition,
+            )
+
+        return self._to_records(results, convert_decimals, distinct)
+
+    def _run_query(
+        self, session, model, filters, selected_columns_or_path, limit, group_by,
+        order_by, order, offset, time_bucket, only_latest, partition=None,
+    ):
+        partition_clause = self._partition_clause(model, partition) if partition else sa.true()
+        query = session.query(model).filter(partition_clause)
 
    
         if selected_columns_or_path:
@@ -56,7 +101,7 @@ class SQLiteLoader:
 
    
         if filters:
-            query = query.filter(*[model.c[key] == value for key, value in filters.items()])
+            query = query.filter(*[filter_clause(model.c[key], value) for key, value in filters.items()])
         
    
         if group_by:
@@ -86,7 +131,7 @@ class SQLiteLoader:
                             partition_by=model.c[latest_on_column], 
                             order_by=model.c[timestamp_column].desc()
                         ).label("rn")
-                    ).alias("subq")
+                    ).where(partition_clause).alias("subq")
                 )
 
                 query = session.query(subquery).filter(subquery.c.rn == 1)  
@@ -111,13 +156,34 @@ class SQLiteLoader:
             ).label("time_bucket")
 
            
-            query = session.query(distinct_column_ref).distinct(distinct_column_ref)
+            query = session.query(distinct_column_ref).filter(partition_clause).distinct(distinct_column_ref)
 
        
-        results = query.all()
-        session.close()
-
-        
+        self.advisor.record(
+            getattr(model, "name", None) or getattr(model, "__tablename__", str(model)), query.statement,
+            filters=filters, order_by=order_by, order=order, only_latest=only_latest, group_by=group_by,
+        )
+        return query.all()
+
+
+    @staticmethod
+    def _partition_clause(model, partition: dict):
+        column = model.c[partition["column"]]
+        if "modulus" in partition:
+            return func.abs(column) % partition["modulus"] == partition["remainder"]
+        conditions = []
+        if partition.get("lower") is not None:
+            conditions.append(column >= partition["lower"])
+        if partition.get("upper") is not None:
+            conditions.append(column < partition["upper"])
+        return sa.and_(sa.true(), *conditions)
+
+    def column_bounds(self, model: Any, column: str):
+        """Return (min, max) of `column`, used to plan range partitions."""
+        with timed_session(self.ReadSession, self.read_metrics) as session:
+            return tuple(session.query(func.min(model.c[column]), func.max(model.c[column])).one())
+
+    def _to_records(self, results, convert_decimals, distinct):
         def model_to_dict(row):
             """Converts SQLAlchemy ORM objects and Table row results into dictionaries."""
             if hasattr(row, "__dict__"):  
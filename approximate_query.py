@@ -0,0 +1,513 @@
+import io
+import json
+import os
+import threading
+import uuid
+import zipfile
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def _hash(values: pd.Series) -> np.ndarray:
+    """64-bit hashes that are stable across processes."""
+    values = values.dropna()
+    # Integer keys read back as floats (e.g. after a NaN) must hash the same.
+    if pd.api.types.is_float_dtype(values) and len(values) and (values % 1 == 0).all():
+        values = values.astype("int64")
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _json_value(value: Any) -> Any:
+    """Convert numpy scalars in partition keys and versions to JSON values."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**p one-byte registers; relative standard error 1.04 / sqrt(2**p)."""
+
+    def __init__(self, p: int = 10):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def add(self, values: pd.Series):
+        hashes = _hash(values)
+        if not len(hashes):
+            return
+        index = hashes >> np.uint64(64 - self.p)
+        rest = (hashes << np.uint64(self.p)) >> np.uint64(11)
+        # frexp gives the exact bit length of integers below 2**53.
+        bit_length = np.frexp(rest.astype(np.float64))[1] + 11
+        rank = np.where(rest == 0, 64 - self.p + 1, 65 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang, Liberty).
+
+    Items on level i stand for 2**i inputs. A level over capacity is sorted
+    and every other item, from a random offset, is promoted to the next level.
+    The normalized rank error is about 2.296 / k**0.9723 with high probability.
+    """
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                leftover = items[len(items) - len(items) % 2:]
+                items = items[: len(items) - len(items) % 2]
+                promoted = items[int(self._rng.integers(2))::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = leftover
+            level += 1
+
+    def add(self, values: pd.Series):
+        values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def rank_error(self) -> float:
+        return 2.296 / self.k ** 0.9723
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.clip(np.asarray(qs, dtype=np.float64), 0, 1) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)]
+
+
+class SketchStore:
+    """
+    Per-partition sketches and a reservoir sample of one table, for approximate queries.
+
+    Rows are partitioned by `bucket_interval` of `time_column` and by the
+    values of `group_columns`. Each partition keeps a HyperLogLog per
+    `distinct_columns` entry, a KLL sketch per `quantile_columns` entry and an
+    exact row count. Queries merge the partitions they touch, so their cost
+    depends on the number of partitions, not the number of rows. Ad-hoc
+    filters are answered from a uniform reservoir sample of `sample_size` rows.
+
+    Sketches describe the rows ingested since the last `rebuild`: an upsert
+    that replaces a row adds the new values without removing the old ones.
+    Row counts, quantiles and the sample then overweight replaced rows, and a
+    row whose time bucket or group value changed is still counted as distinct
+    in its old partition. `replaced_rows` counts these rows until the next
+    rebuild; the loader reports sketches with any as stale and rebuilds them
+    once `drift` passes its threshold. `sample_size=0` disables the sample.
+
+    The store is saved to `path` as an `.npz` archive of plain arrays plus
+    JSON metadata, written with an atomic rename and loaded without pickle.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        time_column: str = "timestamp_updated",
+        bucket_interval: str = "1h",
+        group_columns: Sequence[str] = ("cargo_type",),
+        distinct_columns: Sequence[str] = ("mmsi_no",),
+        quantile_columns: Sequence[str] = ("speed",),
+        hll_precision: int = 10,
+        kll_k: int = 200,
+        sample_size: int = 10000,
+        seed: int = None,
+    ):
+        self.path = path
+        self.time_column = time_column
+        self.bucket_interval = bucket_interval
+        self.group_columns = list(group_columns)
+        self.distinct_columns = list(distinct_columns)
+        self.quantile_columns = list(quantile_columns)
+        self.hll_precision = hll_precision
+        self.kll_k = kll_k
+        self.sample_size = sample_size
+        self.version: Any = None
+        self.partitions: Dict[tuple, Dict[str, Any]] = {}
+        self.sample: Optional[pd.DataFrame] = None
+        self.rows_seen = 0
+        self.replaced_rows = 0
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    # Persistence
+
+    def _settings(self) -> Dict[str, Any]:
+        return {
+            "time_column": self.time_column,
+            "bucket_interval": self.bucket_interval,
+            "group_columns": self.group_columns,
+            "distinct_columns": self.distinct_columns,
+            "quantile_columns": self.quantile_columns,
+            "hll_precision": self.hll_precision,
+            "kll_k": self.kll_k,
+            "sample_size": self.sample_size,
+        }
+
+    @classmethod
+    def open(cls, path: str, **kwargs) -> "SketchStore":
+        """
+        Load the store saved at `path`, or return an empty one when it is
+        missing, unreadable or was built with different settings.
+        """
+        store = cls(path, **kwargs)
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                meta = json.loads(str(archive["meta"]))
+                if meta["settings"] != store._settings():
+                    return store
+                store._restore(meta, archive)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return cls(path, **kwargs)
+        return store
+
+    def _restore(self, meta: Dict[str, Any], archive):
+        self.version = meta["version"]
+        self.rows_seen = meta["rows_seen"]
+        self.replaced_rows = meta["replaced_rows"]
+        self._rng.bit_generator.state = meta["rng"]
+
+        registers = archive["hll"]
+        kll_items, kll_lengths = archive["kll_items"], archive["kll_lengths"]
+        item_offset = length_offset = 0
+        for i, part in enumerate(meta["partitions"]):
+            key = part["key"]
+            key[0] = pd.Timestamp(key[0]) if key[0] is not None else pd.NaT
+            hll = {}
+            for j, col in enumerate(self.distinct_columns):
+                hll[col] = HyperLogLog(self.hll_precision)
+                hll[col].registers = registers[i, j].copy()
+            kll = {}
+            for col, n, levels in zip(self.quantile_columns, part["kll_n"], part["kll_levels"]):
+                sketch = KLLSketch(self.kll_k)
+                sketch.n = n
+                sketch.levels = []
+                for length in kll_lengths[length_offset:length_offset + levels]:
+                    sketch.levels.append(kll_items[item_offset:item_offset + length].copy())
+                    item_offset += int(length)
+                length_offset += levels
+                kll[col] = sketch
+            self.partitions[tuple(key)] = {"rows": part["rows"], "hll": hll, "kll": kll}
+
+        sample = archive["sample"]
+        if len(sample):
+            self.sample = pq.read_table(pa.BufferReader(sample.tobytes())).to_pandas()
+
+    def save(self):
+        with self._lock:
+            partitions, kll_items, kll_lengths = [], [], []
+            registers = np.zeros((len(self.partitions), len(self.distinct_columns), 1 << self.hll_precision), dtype=np.uint8)
+            for i, (key, part) in enumerate(self.partitions.items()):
+                for j, col in enumerate(self.distinct_columns):
+                    registers[i, j] = part["hll"][col].registers
+                for col in self.quantile_columns:
+                    kll_items.extend(part["kll"][col].levels)
+                    kll_lengths.extend(len(items) for items in part["kll"][col].levels)
+                partitions.append({
+                    "key": [None if pd.isna(key[0]) else key[0].isoformat()] + [_json_value(value) for value in key[1:]],
+                    "rows": part["rows"],
+                    "kll_n": [part["kll"][col].n for col in self.quantile_columns],
+                    "kll_levels": [len(part["kll"][col].levels) for col in self.quantile_columns],
+                })
+            sample = b""
+            if self.sample is not None:
+                buffer = io.BytesIO()
+                self.sample.to_parquet(buffer, index=False)
+                sample = buffer.getvalue()
+            meta = {
+                "settings": self._settings(),
+                "version": _json_value(self.version),
+                "rows_seen": self.rows_seen,
+                "replaced_rows": self.replaced_rows,
+                "rng": self._rng.bit_generator.state,
+                "partitions": partitions,
+            }
+
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                hll=registers,
+                kll_items=np.concatenate(kll_items) if kll_items else np.empty(0),
+                kll_lengths=np.array(kll_lengths, dtype=np.int64),
+                sample=np.frombuffer(sample, dtype=np.uint8),
+            )
+        os.replace(tmp_path, self.path)
+
+    # Maintenance
+
+    def _partition_keys(self, df: pd.DataFrame) -> pd.DataFrame:
+        keys = pd.DataFrame(index=df.index)
+        keys["time_bucket"] = pd.to_datetime(df[self.time_column]).dt.floor(self.bucket_interval)
+        for col in self.group_columns:
+            keys[col] = df[col]
+        return keys
+
+    def add(self, df: pd.DataFrame, replaced_rows: int = 0):
+        """
+        Fold a batch of rows into the sketches and the reservoir.
+
+        :param replaced_rows: Rows of the batch that replace rows already folded in
+        """
+        if not len(df):
+            return
+        with self._lock:
+            self.replaced_rows += replaced_rows
+            keys = self._partition_keys(df)
+            for key, index in keys.groupby(list(keys.columns), dropna=False).groups.items():
+                key = key if isinstance(key, tuple) else (key,)
+                part = self.partitions.get(key)
+                if part is None:
+                    part = self.partitions[key] = {
+                        "rows": 0,
+                        "hll": {col: HyperLogLog(self.hll_precision) for col in self.distinct_columns},
+                        "kll": {col: KLLSketch(self.kll_k) for col in self.quantile_columns},
+                    }
+                rows = df.loc[index]
+                part["rows"] += len(rows)
+                for col, sketch in part["hll"].items():
+                    sketch.add(rows[col])
+                for col, sketch in part["kll"].items():
+                    sketch.add(rows[col])
+            self._add_to_sample(df)
+
+    def _add_to_sample(self, df: pd.DataFrame):
+        # Algorithm R, vectorized over the batch.
+        if self.sample_size <= 0:
+            self.rows_seen += len(df)
+            return
+        df = df.reset_index(drop=True)
+        filled = 0 if self.sample is None else len(self.sample)
+        take = min(self.sample_size - filled, len(df))
+        if take > 0:
+            head = df.iloc[:take]
+            self.sample = head.copy() if self.sample is None else pd.concat([self.sample, head], ignore_index=True)
+        rest = df.iloc[max(take, 0):]
+        seen = self.rows_seen + max(take, 0) + np.arange(1, len(rest) + 1)
+        accepted = np.flatnonzero(self._rng.random(len(rest)) < self.sample_size / seen)
+        if len(accepted):
+            slots = self._rng.integers(0, self.sample_size, size=len(accepted))
+            # Later rows win a slot drawn more than once, as in the sequential algorithm.
+            chosen = dict(zip(slots.tolist(), accepted.tolist()))
+            replacement = rest.iloc[list(chosen.values())][self.sample.columns]
+            replacement.index = list(chosen)
+            self.sample.loc[replacement.index] = replacement
+        self.rows_seen += len(df)
+
+    @property
+    def drift(self) -> float:
+        """Fraction of the ingested rows that replaced earlier ones."""
+        return self.replaced_rows / self.rows_seen if self.rows_seen else 0.0
+
+    def rebuild(self, df: pd.DataFrame, version: Any = None):
+        """Recompute everything from the full table."""
+        with self._lock:
+            self.partitions, self.sample, self.rows_seen, self.replaced_rows = {}, None, 0, 0
+        self.add(df)
+        self.version = version
+
+    def apply(
+        self, df: pd.DataFrame, base_version: Any, version: Any, read_table: Callable[[], pd.DataFrame],
+        replaced_rows: int = 0,
+    ):
+        """
+        Fold an upserted batch into a store that reflects `base_version`;
+        rebuild from `read_table()` when the store is missing or out of date.
+
+        :param replaced_rows: Rows of the batch that updated an existing key
+        """
+        if self.version is not None and self.version == base_version:
+            self.add(df, replaced_rows)
+            self.version = version
+        else:
+            self.rebuild(read_table(), version)
+
+    # Queries
+
+    def _select(self, group_by: List[str], filters: dict, start: Any, end: Any) -> Dict[tuple, List[dict]]:
+        key_columns = ["time_bucket"] + self.group_columns
+        for col in group_by:
+            if col not in key_columns:
+                raise ValueError(f"Sketches are not partitioned by '{col}'; use sample_estimate")
+        for col in filters or {}:
+            if col not in self.group_columns:
+                raise ValueError(f"Sketches cannot filter on '{col}'; use sample_estimate")
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+
+        groups: Dict[tuple, List[dict]] = {}
+        for key, part in self.partitions.items():
+            values = dict(zip(key_columns, key))
+            if start is not None and values["time_bucket"] < start:
+                continue
+            if end is not None and values["time_bucket"] >= end:
+                continue
+            matched = True
+            for col, value in (filters or {}).items():
+                allowed = value if isinstance(value, list) else [value]
+                if values[col] not in allowed:
+                    matched = False
+                    break
+            if matched:
+                groups.setdefault(tuple(values[col] for col in group_by), []).append(part)
+        return groups
+
+    def distinct(
+        self, column: str = "mmsi_no", group_by: List[str] = None, filters: dict = None, start: Any = None, end: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Approximate COUNT(DISTINCT column) per group.
+
+        :param group_by: Any of "time_bucket" and the store's `group_columns`
+        :param filters: Equality or list filters on `group_columns`
+        :param start: Inclusive lower bound on the time bucket
+        :param end: Exclusive upper bound on the time bucket
+        :return: List of dictionaries with the group values, "estimate", a 95% "lower"/"upper" and "rows"
+        """
+        group_by = list(group_by or [])
+        results = []
+        for group, parts in sorted(self._select(group_by, filters, start, end).items(), key=lambda item: str(item[0])):
+            sketch = HyperLogLog(self.hll_precision)
+            for part in parts:
+                sketch.merge(part["hll"][column])
+            estimate = sketch.estimate()
+            margin = 1.96 * sketch.relative_error * estimate
+            results.append(dict(
+                zip(group_by, group),
+                estimate=estimate,
+                lower=float(max(estimate - margin, 0.0)),
+                upper=float(estimate + margin),
+                relative_error=float(sketch.relative_error),
+                rows=sum(part["rows"] for part in parts),
+            ))
+        return results
+
+    def quantiles(
+        self, column: str = "speed", qs: Sequence[float] = (0.5, 0.9, 0.99), group_by: List[str] = None,
+        filters: dict = None, start: Any = None, end: Any = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Approximate quantiles of `column` per group.
+
+        "lower"/"upper" are the values at rank q -/+ "rank_error".
+        """
+        group_by = list(group_by or [])
+        results = []
+        for group, parts in sorted(self._select(group_by, filters, start, end).items(), key=lambda item: str(item[0])):
+            sketch = KLLSketch(self.kll_k)
+            for part in parts:
+                sketch.merge(part["kll"][column])
+            eps = sketch.rank_error
+            values = sketch.quantiles(qs)
+            lower = sketch.quantiles([q - eps for q in qs])
+            upper = sketch.quantiles([q + eps for q in qs])
+            for i, q in enumerate(qs):
+                results.append(dict(
+                    zip(group_by, group),
+                    quantile=q, value=float(values[i]), lower=float(lower[i]), upper=float(upper[i]),
+                    rank_error=eps, rows=sketch.n,
+                ))
+        return results
+
+    def sample_estimate(
+        self, filters: dict = None, column: str = None, qs: Sequence[float] = (0.5,),
+        apply_filters: Callable[[pd.DataFrame, dict], pd.DataFrame] = None,
+    ) -> Dict[str, Any]:
+        """
+        Estimate the row count matching `filters`, and optionally the mean and
+        quantiles of `column` among them, from the reservoir sample.
+
+        :param apply_filters: `load_data`-style filter function, e.g. `ParquetLoader._apply_filters`
+        :return: Dictionary of estimates with 95% confidence intervals
+        """
+        if self.sample is None or not len(self.sample):
+            return {"count": 0.0, "count_lower": 0.0, "count_upper": 0.0, "sample_rows": 0, "matched_rows": 0}
+        sample = self.sample
+        matched = apply_filters(sample, filters) if filters else sample
+        n, total, k = len(sample), self.rows_seen, len(matched)
+
+        p = k / n
+        # Finite population correction: an exhaustive sample has no error.
+        fpc = np.sqrt((total - n) / (total - 1)) if total > 1 else 0.0
+        count_margin = 1.96 * np.sqrt(p * (1 - p) / n) * fpc * total
+        result = {
+            "count": float(p * total),
+            "count_lower": float(max(p * total - count_margin, 0.0)),
+            "count_upper": float(p * total + count_margin),
+            "sample_rows": n,
+            "matched_rows": k,
+        }
+
+        if column is not None and k:
+            values = pd.to_numeric(matched[column], errors="coerce").dropna().to_numpy(dtype=np.float64)
+            if len(values):
+                mean_margin = 1.96 * (values.std(ddof=1) if len(values) > 1 else 0.0) / np.sqrt(len(values)) * fpc
+                result.update(mean=float(values.mean()), mean_lower=float(values.mean() - mean_margin),
+                              mean_upper=float(values.mean() + mean_margin))
+                values = np.sort(values)
+                quantiles = []
+                for q in qs:
+                    # Order-statistic interval from the binomial normal approximation.
+                    spread = 1.96 * np.sqrt(len(values) * q * (1 - q))
+                    index = lambda rank: int(np.clip(np.ceil(rank) - 1, 0, len(values) - 1))
+                    quantiles.append({
+                        "quantile": q,
+                        "value": float(values[index(q * len(values))]),
+                        "lower": float(values[index(q * len(values) - spread)]),
+                        "upper": float(values[index(q * len(values) + spread)]),
+                    })
+                result["quantiles"] = quantiles
+        return result
@@ -0,0 +1,197 @@
+"""
+Command-line entry point for load, upsert and convert.
+
+Only the backend named on the command line is imported, so short cron jobs do
+not pay for pandas, pyarrow, SQLAlchemy and DuckDB when they need one of them.
+
+    python cli.py load --backend sqlite --db sqlite:///sample.sqlite --table ship_data --limit 10
+    python cli.py upsert --backend duckdb --db my_database.duckdb --table ship_data --input batch.json
+    python cli.py convert --input ship_data.csv --output data.parquet
+"""
+import argparse
+import contextlib
+import csv
+import json
+import sys
+
+
+def _coerce(value: str):
+    """Turn CSV strings back into ints and floats where possible."""
+    if value == "":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _parse_filters(items):
+    filters = {}
+    for item in items or []:
+        for op in (">=", "<=", "!=", ">", "<", "="):
+            if op in item:
+                column, value = item.split(op, 1)
+                value = _coerce(value)
+                if op == "=":
+                    filters[column] = value
+                else:
+                    filters.setdefault(column, {})[op] = value
+                break
+        else:
+            raise SystemExit(f"Invalid filter: {item!r}, expected COLUMN=VALUE or COLUMN>=VALUE")
+    return filters
+
+
+def _read_records(path: str):
+    if path == "-":
+        return json.load(sys.stdin)
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return [{k: _coerce(v) for k, v in row.items()} for row in csv.DictReader(f)]
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def _open_loader(args):
+    """Import and build only the requested backend; returns (loader, model)."""
+    if args.backend == "sqlite":
+        from Sqlite_resource import SQLiteLoader
+
+        loader = SQLiteLoader(db_path=args.db, pool_size=1, max_overflow=0, prewarm=False)
+        return loader, loader.table(args.table)
+    if args.backend == "postgres":
+        from postgres_reource import PostgresLoader
+
+        loader = PostgresLoader.from_url(args.db, pool_size=1, max_overflow=0, prewarm=False)
+        return loader, loader.table(args.table)
+    if args.backend == "duckdb":
+        from Duckdb_resourcers import DuckDBLoader
+
+        return DuckDBLoader(db_path=args.db), args.table
+    if args.backend == "parquet":
+        from parquet_resoures import ParquetLoader
+
+        return ParquetLoader(storage_path=args.db), args.db
+    raise SystemExit(f"Unknown backend: {args.backend}")
+
+
+def _quiet():
+    """Send the loaders' progress and error prints to stderr, keeping stdout machine-readable."""
+    return contextlib.redirect_stdout(sys.stderr)
+
+
+def cmd_load(args):
+    with _quiet():
+        loader, model = _open_loader(args)
+    kwargs = dict(
+        selected_columns_or_path=args.columns.split(",") if args.columns else None,
+        time_bucket=None,
+        area_scope=None,
+        filters=_parse_filters(args.filter) or None,
+        limit=args.limit,
+        order_by=args.order_by,
+        order=args.order,
+        distinct=args.distinct,
+    )
+    if args.only_latest:
+        latest_on, _, timestamp_column = args.only_latest.partition(":")
+        kwargs["only_latest"] = {"latest_on": latest_on, "timestamp_column": timestamp_column or "timestamp_updated"}
+    if args.backend == "parquet":
+        kwargs["selected_columns_or_path"] = None
+
+    with _quiet():
+        rows = loader.load_data(model=model, **kwargs)
+    for row in rows:
+        sys.stdout.write(json.dumps(row, default=str) + "\n")
+    return 0
+
+
+def cmd_upsert(args):
+    records = _read_records(args.input)
+    with _quiet():
+        loader, model = _open_loader(args)
+        result = loader.upsert_data(
+            model, records, args.id_fields.split(","),
+            args.unique_fields.split(",") if args.unique_fields else [],
+            args.no_update_cols.split(",") if args.no_update_cols else [],
+            True,
+        )
+    sys.stdout.write(json.dumps(result, default=str) + "\n")
+    return 0 if result.get("success") else 1
+
+
+def cmd_convert(args):
+    """Convert a CSV or Parquet file to Parquet or CSV with pyarrow only."""
+    import pyarrow.parquet as pq
+
+    if args.input.endswith(".csv"):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pa_csv
+
+        table = pa_csv.read_csv(args.input)
+        # Keep timestamps as text, matching the pandas conversion in loading_postgre.py
+        # and the string timestamps the loaders' upserts produce.
+        for i, field in enumerate(table.schema):
+            if pa.types.is_timestamp(field.type):
+                table = table.set_column(i, field.name, pc.strftime(table.column(i), format="%Y-%m-%d %H:%M:%S"))
+    else:
+        table = pq.read_table(args.input)
+
+    if args.output.endswith(".csv"):
+        import pyarrow.csv as pa_csv
+
+        pa_csv.write_csv(table, args.output)
+    else:
+        pq.write_table(table, args.output, compression=args.compression)
+    sys.stdout.write(f"Converted {table.num_rows} rows: {args.input} -> {args.output}\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load, upsert and convert ship data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_backend_args(command):
+        command.add_argument("--backend", required=True, choices=["sqlite", "postgres", "duckdb", "parquet"])
+        command.add_argument("--db", required=True, help="SQLAlchemy URL, DuckDB file or Parquet file")
+        command.add_argument("--table", default="ship_data")
+
+    load = commands.add_parser("load", help="Print rows as JSON lines")
+    add_backend_args(load)
+    load.add_argument("--columns", help="Comma-separated column list")
+    load.add_argument("--filter", action="append", help="COLUMN=VALUE or COLUMN>=VALUE, repeatable")
+    load.add_argument("--limit", type=int)
+    load.add_argument("--order-by")
+    load.add_argument("--order", default="asc", choices=["asc", "desc"])
+    load.add_argument("--distinct", action="store_true")
+    load.add_argument("--only-latest", metavar="LATEST_ON[:TIMESTAMP_COLUMN]")
+    load.set_defaults(func=cmd_load)
+
+    upsert = commands.add_parser("upsert", help="Upsert records from a JSON, JSON lines or CSV file")
+    add_backend_args(upsert)
+    upsert.add_argument("--input", required=True, help="File path, or - for a JSON array on stdin")
+    upsert.add_argument("--id-fields", default="id")
+    upsert.add_argument("--unique-fields")
+    upsert.add_argument("--no-update-cols")
+    upsert.set_defaults(func=cmd_upsert)
+
+    convert = commands.add_parser("convert", help="Convert between CSV and Parquet")
+    convert.add_argument("--input", required=True)
+    convert.add_argument("--output", required=True)
+    convert.add_argument("--compression", default="snappy")
+    convert.set_defaults(func=cmd_convert)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+# SQLAlchemy is imported inside the functions that need it, so DuckDB users of
+# PoolMetrics do not pay for it at import time.
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters for a connection pool: checkouts, waits and saturation.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def attach(self, engine) -> "PoolMetrics":
+        """Listen to the pool events of `engine`."""
+        from sqlalchemy import event
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        return self
+
+    def _on_connect(self, dbapi_conn, record):
+        self.record_connect()
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        self.record_checkout()
+
+    def _on_checkin(self, dbapi_conn, record):
+        self.record_checkin()
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_reuse(self):
+        """Count a checkout of a connection the caller already holds."""
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.in_use = max(self.in_use - 1, 0)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current counters; saturation is in-use / capacity."""
+        with self._lock:
+            saturation = (
+                self.in_use / self.capacity if self.capacity else None
+            )
+            return {
+                "capacity": self.capacity,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "saturation": saturation,
+            }
+
+
+def is_memory_url(db_url) -> bool:
+    """True for SQLite URLs that point at an in-memory database."""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(db_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def create_pooled_engine(
+    db_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    prewarm: bool = True,
+    read_only: bool = False,
+    **engine_kwargs,
+):
+    """
+    Create a SQLAlchemy engine with a sized QueuePool and attached PoolMetrics.
+
+    :param db_url: SQLAlchemy database URL
+    :param pool_size: Number of connections kept open in the pool
+    :param max_overflow: Extra connections allowed above `pool_size` under load
+    :param pool_timeout: Seconds to wait for a free connection before failing
+    :param prewarm: Open `pool_size` connections up front
+    :param read_only: Mark every connection read-only (SQLite `query_only`, Postgres readonly transactions)
+    :return: Tuple of (engine, PoolMetrics)
+    """
+    import sqlalchemy as sa
+    from sqlalchemy import event
+    from sqlalchemy.engine import make_url
+
+    backend = make_url(db_url).get_backend_name()
+
+    if is_memory_url(db_url):
+        # In-memory SQLite lives in a single connection; a sized pool would
+        # hand out separate, empty databases.
+        engine = sa.create_engine(db_url, **engine_kwargs)
+        metrics = PoolMetrics(capacity=1).attach(engine)
+        return engine, metrics
+
+    engine = sa.create_engine(
+        db_url,
+        poolclass=sa.pool.QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+        **engine_kwargs,
+    )
+    metrics = PoolMetrics(capacity=pool_size + max_overflow).attach(engine)
+
+    if read_only:
+        if backend == "sqlite":
+            @event.listens_for(engine, "connect")
+            def _set_query_only(dbapi_conn, record):
+                cursor = dbapi_conn.cursor()
+                cursor.execute("PRAGMA query_only = ON")
+                cursor.close()
+        elif backend == "postgresql":
+            engine = engine.execution_options(postgresql_readonly=True)
+
+    if prewarm:
+        prewarm_pool(engine, pool_size)
+
+    return engine, metrics
+
+
+def prewarm_pool(engine, count: int):
+    """Open `count` connections and return them to the pool."""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+@contextmanager
+def timed_session(session_factory, metrics: Optional[PoolMetrics]):
+    """
+    Open a session, check out its connection eagerly and record time spent
+    waiting on the pool in `metrics`, if given.
+
+    Only checkouts that start while every connection is in use count as
+    waits, so connect and `pool_pre_ping` round-trips are not mistaken for
+    pool contention.
+    """
+    session = session_factory()
+    try:
+        exhausted = (
+            metrics is not None and bool(metrics.capacity)
+            and metrics.snapshot()["in_use"] >= metrics.capacity
+        )
+        start = time.perf_counter()
+        session.connection()
+        if exhausted:
+            metrics.record_wait(time.perf_counter() - start)
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,118 @@
+import re
+from typing import Any, Dict, List
+
+import duckdb
+
+from Duckdb_resourcers import DuckDBCursorPool
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _check_name(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid source name: {name!r}")
+    return name
+
+
+class CrossSourceQuery:
+    """
+    Join Parquet, SQLite, Postgres and DuckDB sources in one vectorized DuckDB query.
+
+    Each source is registered under a name and then referenced from SQL:
+
+        q = CrossSourceQuery()
+        q.register_parquet("positions", "data.parquet")
+        q.register_sqlite("registry", "sample.sqlite")
+        q.query("SELECT p.*, r.name FROM positions p JOIN registry.ship_data r USING (mmsi_no)")
+
+    Parquet files are scanned in place. SQLite, Postgres and DuckDB databases
+    are attached through DuckDB's scanner extensions so their tables are read
+    inside the same query. When an extension cannot be loaded, `register_loader`
+    materializes a table once through any loader's `load_data` instead.
+    Queries run on one cursor per thread from a `DuckDBCursorPool`.
+    """
+
+    def __init__(self, conn=None):
+        self.conn = conn or duckdb.connect(database=":memory:")
+        self.sources: Dict[str, str] = {}
+        self.pool = DuckDBCursorPool(self.conn)
+
+    def cursor(self):
+        """Return a cursor owned by the calling thread."""
+        return self.pool.cursor()
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Return cursor pool metrics, after releasing cursors of finished threads."""
+        self.pool.reap()
+        return self.pool.metrics.snapshot()
+
+    def register_parquet(self, name: str, path: Any) -> "CrossSourceQuery":
+        """Expose a Parquet file (or list of files / glob) as view `name`."""
+        _check_name(name)
+        paths = path if isinstance(path, (list, tuple)) else [path]
+        file_list = ", ".join("'" + str(p).replace("'", "''") + "'" for p in paths)
+        self.conn.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM read_parquet([{file_list}])")
+        self.sources[name] = "parquet"
+        return self
+
+    def _attach(self, name: str, target: str, db_type: str = None, read_only: bool = True):
+        _check_name(name)
+        options = []
+        if db_type:
+            self.conn.execute(f"INSTALL {db_type}; LOAD {db_type};")
+            options.append(f"TYPE {db_type}")
+        if read_only:
+            options.append("READ_ONLY")
+        target = target.replace("'", "''")
+        option_clause = f" ({', '.join(options)})" if options else ""
+        self.conn.execute(f"ATTACH '{target}' AS {name}{option_clause}")
+        self.sources[name] = db_type or "duckdb"
+
+    def register_sqlite(self, name: str, path: str) -> "CrossSourceQuery":
+        """Attach a SQLite file as catalog `name`; its tables are `name.<table>`."""
+        self._attach(name, path, "sqlite")
+        return self
+
+    def register_postgres(self, name: str, dsn: str) -> "CrossSourceQuery":
+        """Attach a Postgres database (libpq DSN or URL) as catalog `name`."""
+        self._attach(name, dsn, "postgres")
+        return self
+
+    def register_duckdb(self, name: str, path: str) -> "CrossSourceQuery":
+        """Attach another DuckDB file as catalog `name`."""
+        self._attach(name, path)
+        return self
+
+    def register_loader(self, name: str, loader, model: Any, **load_kwargs) -> "CrossSourceQuery":
+        """
+        Materialize `loader.load_data(model, ...)` once as table `name`.
+
+        Used for sources DuckDB cannot scan directly; small dimension tables
+        such as a vessel registry are the intended case.
+        """
+        import pandas as pd
+
+        _check_name(name)
+        kwargs = dict(selected_columns_or_path=None, time_bucket=None, area_scope=None, filters=None)
+        kwargs.update(load_kwargs)
+        frame = pd.DataFrame(loader.load_data(model=model, **kwargs))
+        self.conn.register(f"_{name}_frame", frame)
+        self.conn.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM _{name}_frame")
+        self.conn.unregister(f"_{name}_frame")
+        self.sources[name] = "loader"
+        return self
+
+    def query(self, sql: str, params: list = None, log_statement: bool = False) -> List[Dict[str, Any]]:
+        """Run `sql` against the registered sources and return a list of dictionaries."""
+        if log_statement:
+            print(f"Executing Query: {sql}")
+        try:
+            return self.cursor().execute(sql, params or []).fetchdf().to_dict("records")
+        except Exception as e:
+            print(f"Error executing query: {sql}, Error: {str(e)}")
+            raise
+
+    def close(self):
+        self.pool.close()
+        self.conn.close()
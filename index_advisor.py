@@ -0,0 +1,256 @@
+import re
+import threading
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class IndexAdvisor:
+    """
+    Records the query shapes a SQL loader executes and recommends indexes for them.
+
+    A shape is the set of columns a query filters on by equality, filters on by
+    range, orders by, partitions by (`only_latest`) or groups by. Each shape maps
+    to one composite index candidate: equality columns first, then the column
+    the query ranges or sorts on. Candidates already covered by an existing
+    index prefix are dropped.
+    """
+
+    def __init__(
+        self,
+        dialect: str,
+        read_engine=None,
+        write_engine=None,
+        cursor_factory: Optional[Callable[[], Any]] = None,
+        history: int = 200,
+    ):
+        """
+        :param dialect: "sqlite", "postgresql" or "duckdb"
+        :param read_engine: SQLAlchemy engine used for catalog lookups and EXPLAIN
+        :param write_engine: SQLAlchemy engine used to create indexes
+        :param cursor_factory: DuckDB cursor factory, used instead of engines for "duckdb"
+        :param history: Number of recent statements kept for `explain_report`
+        """
+        self.dialect = dialect
+        self.read_engine = read_engine
+        self.write_engine = write_engine or read_engine
+        self.cursor_factory = cursor_factory
+        self.shapes: Counter = Counter()
+        self.statements: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    # Recording
+
+    def record(
+        self,
+        table_name: str,
+        statement: Any = None,
+        filters: dict = None,
+        order_by: str = None,
+        order: str = "asc",
+        only_latest: dict = None,
+        group_by: List[str] = None,
+    ):
+        """
+        Record one `load_data` call; `statement` is the SQL string, a (SQL,
+        parameters) tuple or the SQLAlchemy statement executed.
+        """
+        equality, ranges = [], []
+        for column, value in (filters or {}).items():
+            if isinstance(value, dict) and any(op != "==" for op in value):
+                ranges.append(column)
+            else:
+                equality.append(column)
+
+        candidates = []
+        if only_latest:
+            candidates.append(tuple(
+                [(col, "ASC") for col in sorted(equality)]
+                + [(only_latest["latest_on"], "ASC"), (only_latest["timestamp_column"], "DESC")]
+            ))
+        elif group_by:
+            candidates.append(tuple((col, "ASC") for col in group_by))
+        else:
+            key = [(col, "ASC") for col in sorted(equality)]
+            if ranges:
+                key.append((ranges[0], "ASC"))
+            elif order_by:
+                key.append((order_by, "DESC" if (order or "asc").lower() == "desc" else "ASC"))
+            if key:
+                candidates.append(tuple(key))
+
+        with self._lock:
+            for key in candidates:
+                self.shapes[(table_name, key)] += 1
+            if statement is not None:
+                self.statements.append((table_name, statement))
+
+    # Catalog
+
+    def existing_indexes(self, table_name: str) -> List[Dict[str, Any]]:
+        """Return [{"name", "columns", "unique"}] for `table_name`, primary key included."""
+        if self.dialect == "duckdb":
+            cursor = self.cursor_factory()
+            indexes = []
+            for name, is_unique, expressions in cursor.execute(
+                "SELECT index_name, is_unique, expressions FROM duckdb_indexes() WHERE table_name = ?",
+                [table_name],
+            ).fetchall():
+                columns = [col.strip().strip('"') for col in str(expressions).strip("[]").split(",") if col.strip()]
+                indexes.append({"name": name, "columns": columns, "unique": bool(is_unique)})
+            for constraint_type, columns in cursor.execute(
+                "SELECT constraint_type, constraint_column_names FROM duckdb_constraints() "
+                "WHERE table_name = ? AND constraint_type IN ('PRIMARY KEY', 'UNIQUE')",
+                [table_name],
+            ).fetchall():
+                indexes.append({"name": constraint_type.lower(), "columns": list(columns), "unique": True})
+            return indexes
+
+        import sqlalchemy as sa
+
+        inspector = sa.inspect(self.read_engine)
+        indexes = [
+            {"name": idx["name"], "columns": idx["column_names"], "unique": bool(idx.get("unique"))}
+            for idx in inspector.get_indexes(table_name)
+        ]
+        pk = inspector.get_pk_constraint(table_name).get("constrained_columns")
+        if pk:
+            indexes.append({"name": "primary key", "columns": pk, "unique": True})
+        for uc in inspector.get_unique_constraints(table_name):
+            indexes.append({"name": uc["name"], "columns": uc["column_names"], "unique": True})
+        return indexes
+
+    @staticmethod
+    def _covered(columns: List[str], indexes: List[Dict[str, Any]]) -> bool:
+        return any(index["columns"][: len(columns)] == columns for index in indexes)
+
+    # Recommendations
+
+    def _index_name(self, table_name: str, key: Tuple[Tuple[str, str], ...], unique: bool = False) -> str:
+        prefix = "ux" if unique else "ix"
+        return f"{prefix}_{table_name}_{'_'.join(col for col, _ in key)}"[:63]
+
+    def _ddl(self, table_name: str, key: Tuple[Tuple[str, str], ...], unique: bool = False) -> str:
+        # DuckDB's ART indexes serve lookups only, sort direction is not part of them.
+        parts = [
+            col if self.dialect == "duckdb" or direction == "ASC" else f"{col} DESC"
+            for col, direction in key
+        ]
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        return f"CREATE {kind} IF NOT EXISTS {self._index_name(table_name, key, unique)} ON {table_name} ({', '.join(parts)})"
+
+    def recommend(self, min_count: int = 1) -> List[Dict[str, Any]]:
+        """
+        Return index candidates seen at least `min_count` times and not covered
+        by an existing index, most frequent first.
+        """
+        with self._lock:
+            shapes = list(self.shapes.items())
+
+        existing = {}
+        recommendations = []
+        for (table_name, key), count in sorted(shapes, key=lambda item: -item[1]):
+            if count < min_count:
+                continue
+            if table_name not in existing:
+                existing[table_name] = self.existing_indexes(table_name)
+            if self._covered([col for col, _ in key], existing[table_name]):
+                continue
+            recommendations.append({
+                "table": table_name,
+                "columns": [f"{col} {direction}" for col, direction in key],
+                "count": count,
+                "ddl": self._ddl(table_name, key),
+                "_key": [col for col, _ in key],
+            })
+
+        # An index on (a, b) also serves queries on (a); keep only the longer one.
+        kept = []
+        for rec in recommendations:
+            longer = [
+                other for other in recommendations
+                if other is not rec and other["table"] == rec["table"]
+                and len(other["_key"]) > len(rec["_key"]) and other["_key"][: len(rec["_key"])] == rec["_key"]
+            ]
+            if longer:
+                longer[0]["count"] += rec["count"]
+            else:
+                kept.append(rec)
+        for rec in kept:
+            rec.pop("_key")
+        return kept
+
+    def _execute(self, sql: str, write: bool = False, params: list = None) -> List[tuple]:
+        if self.dialect == "duckdb":
+            return self.cursor_factory().execute(sql, params or []).fetchall()
+        engine = self.write_engine if write else self.read_engine
+        with engine.begin() as conn:
+            result = conn.exec_driver_sql(sql)
+            return result.fetchall() if result.returns_rows else []
+
+    def create_recommended(self, min_count: int = 1) -> List[Dict[str, Any]]:
+        """Create every recommended index; returns the recommendations with a `created` flag or `error`."""
+        results = []
+        for recommendation in self.recommend(min_count):
+            try:
+                self._execute(recommendation["ddl"], write=True)
+                results.append(dict(recommendation, created=True))
+            except Exception as e:
+                results.append(dict(recommendation, created=False, error=str(e)))
+        return results
+
+    def verify_conflict_target(self, table_name: str, id_fields: List[str], create: bool = False) -> Dict[str, Any]:
+        """
+        Check that a unique index or key exists on exactly `id_fields`, as
+        `ON CONFLICT (id_fields)` upserts require; optionally create it.
+        """
+        for index in self.existing_indexes(table_name):
+            if index["unique"] and sorted(index["columns"]) == sorted(id_fields):
+                return {"success": True, "table": table_name, "id_fields": id_fields, "index": index["name"]}
+
+        key = tuple((col, "ASC") for col in id_fields)
+        ddl = self._ddl(table_name, key, unique=True)
+        if not create:
+            return {"success": False, "table": table_name, "id_fields": id_fields, "message": "No unique index", "ddl": ddl}
+        try:
+            self._execute(ddl, write=True)
+            return {"success": True, "table": table_name, "id_fields": id_fields, "index": self._index_name(table_name, key, True), "created": True}
+        except Exception as e:
+            return {"success": False, "table": table_name, "id_fields": id_fields, "message": str(e), "ddl": ddl}
+
+    # EXPLAIN
+
+    def _compile(self, statement: Any) -> str:
+        if isinstance(statement, tuple):
+            return statement[0]
+        if isinstance(statement, str):
+            return statement
+        engine = self.read_engine
+        return str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+    def _is_full_scan(self, plan: str, table_name: str) -> bool:
+        if self.dialect == "sqlite":
+            return re.search(rf"\bSCAN {re.escape(table_name)}\b(?! USING (COVERING )?INDEX)", plan) is not None
+        if self.dialect == "postgresql":
+            return f"Seq Scan on {table_name}" in plan
+        return "Sequential Scan" in plan or "SEQ_SCAN" in plan
+
+    def explain_report(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        EXPLAIN the most recent recorded statements and flag full table scans.
+
+        :return: List of {"table", "sql", "full_scan", "plan"}, newest first
+        """
+        with self._lock:
+            recent = list(self.statements)[-limit:][::-1]
+
+        prefix = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN ", "duckdb": "EXPLAIN "}[self.dialect]
+        report = []
+        for table_name, statement in recent:
+            try:
+                sql = self._compile(statement)
+                rows = self._execute(prefix + sql, params=statement[1] if isinstance(statement, tuple) else None)
+                plan = "\n".join(str(row[-1]) for row in rows)
+                report.append({"table": table_name, "sql": sql, "full_scan": self._is_full_scan(plan, table_name), "plan": plan})
+            except Exception as e:
+                report.append({"table": table_name, "sql": str(statement), "full_scan": None, "plan": None, "error": str(e)})
+        return report
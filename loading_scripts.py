@@ -6,7 +6,7 @@ from Sqlite_resource import SQLiteLoader
 import sqlalchemy as sa
 from sqlalchemy.orm import sessionmaker
 
-from sqlalchemy import MetaData, Table
+from schema_catalog import default_catalog
 
 
 def main():
@@ -18,13 +18,8 @@ def main():
 
     engine = sa.create_engine(SQLITE_DB_PATH)
 
-    metadata = MetaData()
-   
-
-    metadata.reflect(bind=engine)
-    users_table = metadata.tables.get("ship_data")
-    if users_table is None:
-        raise ValueError("Table 'ship_data' does not exist in the database")
+    # Reflects only ship_data, once per process, instead of the whole database.
+    users_table = default_catalog.table(engine, "ship_data")
 
    
     SessionLocal = sessionmaker(bind=engine)
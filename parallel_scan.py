@@ -0,0 +1,254 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional
+
+
+def plan_partitions(
+    loader,
+    model: Any,
+    strategy: str = "range",
+    column: str = "id",
+    parts: int = None,
+    selected_columns_or_path: Any = None,
+    snapshot: Any = None,
+) -> List[Dict[str, Any]]:
+    """
+    Split a table into disjoint partitions for `parallel_load_data`.
+
+    :param loader: Any loader exposing `load_data(..., partition=...)`
+    :param model: Table (or table name) to split
+    :param strategy: "range" on `column` min/max, "hash" on `column`, or "row_group" (Parquet only)
+    :param column: Partition column; must be non-null for range and hash strategies
+    :param parts: Number of partitions, defaults to the CPU count
+    :param selected_columns_or_path: Parquet table path, as passed to `ParquetLoader.load_data`
+    :param snapshot: Pinned Parquet version to plan against, see `ParquetLoader.snapshot`
+    :return: List of partition dictionaries
+    """
+    parts = parts or os.cpu_count() or 1
+
+    if strategy == "hash":
+        return [{"column": column, "modulus": parts, "remainder": r} for r in range(parts)]
+
+    if strategy == "row_group":
+        if not hasattr(loader, "row_group_count"):
+            raise ValueError("Row group partitioning is only supported by ParquetLoader")
+        count = loader.row_group_count(selected_columns_or_path, snapshot=snapshot)
+        parts = min(parts, count)
+        # Contiguous ranges keep partition order equal to file order, which
+        # `merge_partition_results` relies on for "first row" semantics.
+        return [{"row_groups": list(range(i * count // parts, (i + 1) * count // parts))} for i in range(parts)]
+
+    if strategy != "range":
+        raise ValueError(f"Unsupported partition strategy: {strategy}")
+
+    if hasattr(loader, "row_group_count"):
+        low, high = loader.column_bounds(selected_columns_or_path, column, snapshot=snapshot)
+    else:
+        low, high = loader.column_bounds(model, column)
+    if low is None or high is None:
+        return [{"column": column}]
+
+    if isinstance(low, int) and isinstance(high, int):
+        step = max(-(-(high - low + 1) // parts), 1)
+        bounds = list(range(low, high + 1, step))
+    else:
+        width = (high - low) / parts
+        bounds = [low + width * i for i in range(parts)]
+
+    partitions = []
+    for i, lower in enumerate(bounds):
+        upper = bounds[i + 1] if i + 1 < len(bounds) else None
+        partitions.append({"column": column, "lower": lower, "upper": upper})
+    return partitions
+
+
+def merge_partition_results(
+    results: List[List[Dict[str, Any]]],
+    order_by: str = None,
+    order: str = "asc",
+    limit: int = None,
+    offset: int = None,
+    distinct: bool = False,
+    only_latest: dict = None,
+    group_by: List[str] = None,
+    time_bucket: dict = None,
+) -> List[Dict[str, Any]]:
+    """
+    Combine per-partition `load_data` results into the result of one full scan.
+
+    `results` must be in partition order. `group_by` keeps the first row of
+    each group in that order, which is the file's order for "row_group"
+    partitions and for "range" partitions on a column the file is sorted by.
+    """
+    rows = list(chain.from_iterable(results))
+
+    if only_latest:
+        timestamp_column = only_latest["timestamp_column"]
+        latest_on = only_latest["latest_on"]
+        latest = {}
+        for row in rows:
+            key = row.get(latest_on)
+            if key not in latest or row.get(timestamp_column) > latest[key].get(timestamp_column):
+                latest[key] = row
+        rows = list(latest.values())
+
+    if group_by:
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row.get(col) for col in group_by), row)
+        # A single scan returns groups sorted by their keys, nulls last.
+        rows = [groups[key] for key in sorted(groups, key=lambda key: [(1, 0) if _is_null(v) else (0, v) for v in key])]
+
+    if distinct or time_bucket:
+        distinct_column = (time_bucket or {}).get("distinct_column")
+        seen = set()
+        unique_rows = []
+        for row in rows:
+            if time_bucket and "time_bucket" in row and distinct_column in row:
+                # The same value is distinct once per bucket, not once overall.
+                key = (row["time_bucket"], row[distinct_column])
+            else:
+                key = tuple(row.items())
+            if key not in seen:
+                seen.add(key)
+                unique_rows.append(row)
+        rows = unique_rows
+
+    if order_by:
+        # Nulls go last in either direction, as in pandas `sort_values`.
+        nulls = [row for row in rows if _is_null(row.get(order_by))]
+        rows = [row for row in rows if not _is_null(row.get(order_by))]
+        rows.sort(key=lambda row: row[order_by], reverse=(order or "asc").lower() == "desc")
+        rows += nulls
+
+    if offset:
+        rows = rows[offset:]
+    if limit:
+        rows = rows[:limit]
+    return rows
+
+
+def _is_null(value: Any) -> bool:
+    return value is None or value != value
+
+
+def _load_partition(loader, model, partition, load_kwargs):
+    return loader.load_data(model=model, partition=partition, **load_kwargs)
+
+
+def _load_partition_in_process(loader_factory, model, partition, load_kwargs):
+    return _load_partition(loader_factory(), model, partition, load_kwargs)
+
+
+def parallel_load_data(
+    loader,
+    model: Any,
+    partitions: List[Dict[str, Any]] = None,
+    strategy: str = "range",
+    column: str = "id",
+    parts: int = None,
+    max_workers: int = None,
+    executor: str = "thread",
+    loader_factory: Optional[Callable[[], Any]] = None,
+    **load_kwargs,
+) -> List[Dict[str, Any]]:
+    """
+    Run `loader.load_data` over disjoint partitions in parallel and merge the results.
+
+    `order_by`, `limit` and `offset` are re-applied to the merged rows. `limit` is
+    pushed into each partition only when that cannot drop a row of the final
+    result. `only_latest`, `group_by`, `distinct` and `time_bucket` are re-applied
+    across partitions, so any partition column gives the same rows; hashing on
+    the `latest_on` / `group_by` column keeps each key inside one partition.
+    Which row `group_by` keeps for a group spanning partitions follows
+    partition order, see `merge_partition_results`.
+
+    :param loader: Loader used by thread workers and for partition planning
+    :param model: Table (or table name) passed to `load_data`
+    :param partitions: Precomputed partitions, otherwise planned with `plan_partitions`
+    :param strategy: "range", "hash" or "row_group", see `plan_partitions`
+    :param column: Partition column for range and hash strategies
+    :param parts: Number of partitions, defaults to `max_workers`
+    :param max_workers: Pool size, defaults to the CPU count
+    :param executor: "thread" or "process"
+    :param loader_factory: Picklable zero-argument callable building a loader, required for "process"
+    :param load_kwargs: Remaining `load_data` arguments
+    :return: List of dictionaries, as returned by `load_data`
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Versioned Parquet tables: plan and read every partition from one pinned
+    # version, so a commit landing mid-scan cannot mix two versions.
+    pinned = None
+    if hasattr(loader, "snapshot") and load_kwargs.get("snapshot") is None:
+        pinned = load_kwargs["snapshot"] = loader.snapshot(load_kwargs.get("selected_columns_or_path"))
+    try:
+        return _parallel_load_data(
+            loader, model, partitions, strategy, column, parts, max_workers, executor, loader_factory, load_kwargs,
+        )
+    finally:
+        if pinned is not None:
+            pinned.release()
+
+
+def _parallel_load_data(
+    loader, model, partitions, strategy, column, parts, max_workers, executor, loader_factory, load_kwargs,
+):
+    if partitions is None:
+        partitions = plan_partitions(
+            loader, model, strategy=strategy, column=column, parts=parts or max_workers,
+            selected_columns_or_path=load_kwargs.get("selected_columns_or_path"),
+            snapshot=load_kwargs.get("snapshot"),
+        )
+
+    order_by = load_kwargs.get("order_by")
+    order = load_kwargs.get("order") or "asc"
+    limit = load_kwargs.get("limit")
+    offset = load_kwargs.get("offset")
+    distinct = load_kwargs.get("distinct")
+    only_latest = load_kwargs.get("only_latest")
+    group_by = load_kwargs.get("group_by")
+    time_bucket = load_kwargs.get("time_bucket")
+
+    partition_kwargs = dict(load_kwargs, offset=None)
+    project_bucket = False
+    if time_bucket and hasattr(loader, "row_group_count") and not time_bucket.get("keep_bucket"):
+        # ParquetLoader returns only the distinct column; ask partitions for
+        # the bucket as well and project it away after the merge.
+        partition_kwargs["time_bucket"] = dict(time_bucket, keep_bucket=True)
+        project_bucket = True
+    if limit and not (only_latest or group_by or time_bucket):
+        # Each partition's first `offset + limit` rows contain every row of the
+        # merged window, because the same ordering is applied on merge.
+        partition_kwargs["limit"] = limit + (offset or 0)
+    else:
+        partition_kwargs["limit"] = None
+
+    if executor == "process":
+        if loader_factory is None:
+            raise ValueError("executor='process' requires a picklable loader_factory")
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_load_partition_in_process, loader_factory, model, partition, partition_kwargs)
+                for partition in partitions
+            ]
+            results = [future.result() for future in futures]
+    elif executor == "thread":
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(_load_partition, loader, model, partition, partition_kwargs)
+                for partition in partitions
+            ]
+            results = [future.result() for future in futures]
+    else:
+        raise ValueError(f"Unsupported executor: {executor}")
+
+    rows = merge_partition_results(
+        results, order_by=order_by, order=order, limit=limit, offset=offset,
+        distinct=distinct, only_latest=only_latest, group_by=group_by, time_bucket=time_bucket,
+    )
+    if project_bucket:
+        distinct_column = time_bucket.get("distinct_column")
+        rows = [{distinct_column: row[distinct_column]} for row in rows]
+    return rows
@@ -0,0 +1,227 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+def _numeric_column(column: pa.ChunkedArray) -> np.ndarray:
+    """Map a column onto float64 so it can be scaled for space-filling curves."""
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        try:
+            column = pc.cast(column, pa.timestamp("ns"))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Non-temporal text: order by dictionary rank instead.
+            column = pc.rank(column, sort_keys="ascending", tiebreaker="dense")
+    if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+        column = pc.cast(pc.cast(column, pa.timestamp("ns")), pa.int64())
+    return np.asarray(column.to_numpy(zero_copy_only=False), dtype=np.float64)
+
+
+def _scale(values: np.ndarray, bits: int) -> np.ndarray:
+    values = np.nan_to_num(values, nan=np.nanmin(values) if np.isfinite(values).any() else 0.0)
+    low, high = values.min(), values.max()
+    top = (1 << bits) - 1
+    if high == low:
+        return np.zeros(len(values), dtype=np.uint64)
+    return np.round((values - low) / (high - low) * top).astype(np.uint64)
+
+
+def _interleave(axes: List[np.ndarray], bits: int) -> np.ndarray:
+    """Interleave the bits of each axis, first axis most significant."""
+    key = np.zeros(len(axes[0]), dtype=np.uint64)
+    one = np.uint64(1)
+    for bit in range(bits - 1, -1, -1):
+        for axis in axes:
+            key = (key << one) | ((axis >> np.uint64(bit)) & one)
+    return key
+
+
+def _hilbert_transpose(axes: List[np.ndarray], bits: int) -> List[np.ndarray]:
+    """Skilling's axes-to-transpose step of the Hilbert curve, vectorized over rows."""
+    x = [axis.copy() for axis in axes]
+    n = len(x)
+    m = np.uint64(1 << (bits - 1))
+
+    q = m
+    while q > 1:
+        p = q - np.uint64(1)
+        for i in range(n):
+            high = (x[i] & q) != 0
+            x[0] = np.where(high, x[0] ^ p, x[0])
+            t = np.where(high, np.uint64(0), (x[0] ^ x[i]) & p)
+            x[0] ^= t
+            x[i] ^= t
+        q >>= np.uint64(1)
+
+    for i in range(1, n):
+        x[i] ^= x[i - 1]
+    t = np.zeros_like(x[0])
+    q = m
+    while q > 1:
+        t = np.where((x[n - 1] & q) != 0, t ^ (q - np.uint64(1)), t)
+        q >>= np.uint64(1)
+    for i in range(n):
+        x[i] ^= t
+    return x
+
+
+def cluster_order(table: pa.Table, columns: Sequence[str], method: str = "linear") -> np.ndarray:
+    """
+    Return the row permutation that clusters `table` on `columns`.
+
+    :param method: "linear" (lexicographic sort), "zorder" or "hilbert"
+    """
+    if method == "linear":
+        return pc.sort_indices(table, sort_keys=[(col, "ascending") for col in columns]).to_numpy()
+    if method not in ("zorder", "hilbert"):
+        raise ValueError(f"Unsupported clustering method: {method}")
+
+    bits = 63 // len(columns)
+    axes = [_scale(_numeric_column(table.column(col)), bits) for col in columns]
+    if method == "hilbert":
+        axes = _hilbert_transpose(axes, bits)
+    return np.argsort(_interleave(axes, bits), kind="stable")
+
+
+def _may_match(statistics, value_filter) -> bool:
+    """Whether a row group with these min/max statistics can contain matching rows."""
+    if statistics is None or not statistics.has_min_max:
+        return True
+    low, high = statistics.min, statistics.max
+    try:
+        if isinstance(value_filter, list):
+            return any(low <= v <= high for v in value_filter)
+        if isinstance(value_filter, dict):
+            for op, val in value_filter.items():
+                if op == "==" and not low <= val <= high:
+                    return False
+                if op == ">" and not high > val:
+                    return False
+                if op == ">=" and not high >= val:
+                    return False
+                if op == "<" and not low < val:
+                    return False
+                if op == "<=" and not low <= val:
+                    return False
+            return True
+        return low <= value_filter <= high
+    except TypeError:
+        return True
+
+
+def pruning_report(path: str, workload: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Estimate how much of a file each query in `workload` can skip using row-group
+    min/max statistics.
+
+    :param workload: List of `load_data`-style filters dictionaries
+    :return: Dictionary with per-query and average fractions of row groups and rows skipped
+    """
+    metadata = pq.ParquetFile(path).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    total_rows = metadata.num_rows or 1
+    queries = []
+    for filters in workload:
+        skipped_groups, skipped_rows = 0, 0
+        for rg in range(metadata.num_row_groups):
+            row_group = metadata.row_group(rg)
+            for column, value_filter in filters.items():
+                if column in names and not _may_match(row_group.column(names.index(column)).statistics, value_filter):
+                    skipped_groups += 1
+                    skipped_rows += row_group.num_rows
+                    break
+        queries.append({
+            "filters": filters,
+            "row_groups_skipped": skipped_groups / max(metadata.num_row_groups, 1),
+            "rows_skipped": skipped_rows / total_rows,
+        })
+    count = max(len(queries), 1)
+    return {
+        "row_groups": metadata.num_row_groups,
+        "queries": queries,
+        "avg_row_groups_skipped": sum(q["row_groups_skipped"] for q in queries) / count,
+        "avg_rows_skipped": sum(q["rows_skipped"] for q in queries) / count,
+    }
+
+
+def optimize_parquet(
+    path: str,
+    output: Optional[str] = None,
+    method: str = "linear",
+    columns: Sequence[str] = None,
+    row_group_size: int = 128 * 1024,
+    compression: str = "zstd",
+    use_dictionary: Any = True,
+    bloom_filter_columns: Sequence[str] = ("mmsi_no",),
+    workload: List[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Rewrite a Parquet file clustered by `columns` so row-group statistics prune well.
+
+    :param path: Parquet file to optimize
+    :param output: Destination; defaults to replacing `path` atomically
+    :param method: "linear", "zorder" or "hilbert"
+    :param columns: Clustering key; defaults to (mmsi_no, timestamp_updated) for
+        "linear" and (latitude, longitude, timestamp_updated) otherwise
+    :param row_group_size: Rows per row group
+    :param compression: Parquet codec
+    :param use_dictionary: True, False or list of columns to dictionary-encode
+    :param bloom_filter_columns: Columns to write Bloom filters for, if the installed pyarrow supports it
+    :param workload: Filters dictionaries for the before/after pruning report
+    :return: Dictionary with success status, sizes and the pruning reports
+    """
+    if columns is None:
+        columns = ("mmsi_no", "timestamp_updated") if method == "linear" else ("latitude", "longitude", "timestamp_updated")
+    columns = list(columns)
+
+    before = pruning_report(path, workload) if workload else None
+    bytes_before = os.path.getsize(path)
+
+    table = pq.read_table(path)
+    missing = [col for col in columns if col not in table.column_names]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in '{path}'")
+    table = table.take(pa.array(cluster_order(table, columns, method)))
+
+    write_kwargs = dict(
+        row_group_size=row_group_size,
+        compression=compression,
+        use_dictionary=use_dictionary,
+        write_statistics=True,
+    )
+    if method == "linear":
+        write_kwargs["sorting_columns"] = [
+            pq.SortingColumn(table.column_names.index(col)) for col in columns
+        ]
+    bloom_columns = [col for col in bloom_filter_columns or [] if col in table.column_names]
+    if bloom_columns:
+        write_kwargs["bloom_filter_options"] = {
+            col: {"ndv": max(len(pc.unique(table.column(col))), 1), "fpp": 0.05} for col in bloom_columns
+        }
+
+    destination = output or path
+    tmp_path = destination + ".tmp"
+    try:
+        pq.write_table(table, tmp_path, **write_kwargs)
+    except TypeError:
+        # pyarrow without Bloom filter support.
+        write_kwargs.pop("bloom_filter_options", None)
+        bloom_columns = []
+        pq.write_table(table, tmp_path, **write_kwargs)
+    os.replace(tmp_path, destination)
+
+    return {
+        "success": True,
+        "path": destination,
+        "method": method,
+        "columns": columns,
+        "rows": table.num_rows,
+        "bytes_before": bytes_before,
+        "bytes_after": os.path.getsize(destination),
+        "bloom_filter_columns": bloom_columns,
+        "before": before,
+        "after": pruning_report(destination, workload) if workload else None,
+    }
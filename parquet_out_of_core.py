@@ -0,0 +1,276 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class SpillingReducer:
+    """
+    Keeps one row per key across batches, spilling to disk past a memory budget.
+
+    Rows are reduced with `drop_duplicates(keep="first")` after an optional sort,
+    so the row kept per key is decided by `sort_by` (e.g. newest timestamp first)
+    or, without it, by arrival order. While the state fits in `memory_budget`
+    bytes it stays in one DataFrame. Past that, the state and every later batch
+    are hash-partitioned on the key into Parquet spill files, with enough
+    partitions that each one's reduced state should fit the budget. At the end
+    each partition is read back in budget-sized batches and reduced into a
+    running state; a partition whose state still outgrows the budget is
+    re-partitioned with a different hash seed. Memory is therefore bounded by
+    the budget and the key cardinality of one partition, not by the input size.
+    """
+
+    max_depth = 8
+
+    def __init__(
+        self,
+        key_columns: List[str],
+        schema: pa.Schema,
+        memory_budget: int = 256 * 1024 * 1024,
+        sort_by: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        partitions: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+        depth: int = 0,
+    ):
+        """
+        :param partitions: Spill fan-out; by default derived from the state size and `memory_budget` when spilling
+        :param depth: Re-partitioning level, selects the hash seed
+        """
+        self.key_columns = key_columns
+        self.schema = schema
+        self.memory_budget = memory_budget
+        self.sort_by = sort_by
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.depth = depth
+        self.state: Optional[pd.DataFrame] = None
+        self.bytes_per_row: Optional[float] = None
+        self.spilled = False
+        self.spilled_rows = 0
+        self._tmp_dir = None
+        self._writers: Dict[int, pq.ParquetWriter] = {}
+
+    def _reduce(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.sort_by is not None:
+            df = self.sort_by(df)
+        return df.drop_duplicates(subset=self.key_columns, keep="first")
+
+    def _bytes(self, df: Optional[pd.DataFrame]) -> float:
+        if df is None or not len(df):
+            return 0
+        if self.bytes_per_row is None:
+            self.bytes_per_row = max(df.memory_usage(deep=True).sum() / len(df), 1.0)
+        return self.bytes_per_row * len(df)
+
+    def add(self, batch: pd.DataFrame):
+        if not len(batch):
+            return
+        batch = self._reduce(batch)
+        if self.spilled:
+            self._spill(batch)
+            return
+
+        self.state = batch if self.state is None else self._reduce(pd.concat([self.state, batch], ignore_index=True))
+        state_bytes = self._bytes(self.state)
+        if state_bytes > self.memory_budget:
+            if self.partitions is None:
+                # Aim for partitions a quarter of the budget at today's key count,
+                # leaving room for keys that have not been seen yet.
+                self.partitions = int(min(max(np.ceil(4 * state_bytes / self.memory_budget), 2), 256))
+            self.spilled = True
+            self._tmp_dir = tempfile.mkdtemp(prefix="parquet_spill_", dir=self.spill_dir)
+            state, self.state = self.state, None
+            self._spill(state)
+
+    def _buckets(self, df: pd.DataFrame) -> np.ndarray:
+        hashes = pd.util.hash_pandas_object(df[self.key_columns], index=False, hash_key=f"{self.depth:016d}")
+        return hashes.to_numpy() % np.uint64(self.partitions)
+
+    def _spill(self, df: pd.DataFrame):
+        buckets = self._buckets(df)
+        for bucket in np.unique(buckets):
+            part = df[buckets == bucket]
+            writer = self._writers.get(int(bucket))
+            if writer is None:
+                path = os.path.join(self._tmp_dir, f"part-{int(bucket)}.parquet")
+                writer = self._writers[int(bucket)] = pq.ParquetWriter(path, self.schema)
+            writer.write_table(pa.Table.from_pandas(part, schema=self.schema, preserve_index=False))
+        self.spilled_rows += len(df)
+
+    def _reduce_partition(self, path: str) -> pd.DataFrame:
+        batch_rows = max(int(self.memory_budget // (4 * (self.bytes_per_row or 1.0))), 1024)
+        batches = pq.ParquetFile(path).iter_batches(batch_size=batch_rows)
+        state = None
+        for batch in batches:
+            df = batch.to_pandas()
+            state = self._reduce(df if state is None else pd.concat([state, df], ignore_index=True))
+            if self._bytes(state) > self.memory_budget and self.depth < self.max_depth:
+                # Too many keys landed here: split this partition again with a new seed.
+                child = SpillingReducer(
+                    self.key_columns, self.schema, self.memory_budget, self.sort_by,
+                    spill_dir=self._tmp_dir, depth=self.depth + 1,
+                )
+                try:
+                    child.add(state)
+                    for rest in batches:
+                        child.add(rest.to_pandas())
+                    self.spilled_rows += child.spilled_rows
+                    return child.results()
+                finally:
+                    child.close()
+        return state if state is not None else self.schema.empty_table().to_pandas()
+
+    def results(self) -> pd.DataFrame:
+        """Return the reduced rows; spill partitions are reduced one at a time."""
+        if not self.spilled:
+            return self.state if self.state is not None else self.schema.empty_table().to_pandas()
+        try:
+            for writer in self._writers.values():
+                writer.close()
+            frames = [
+                self._reduce_partition(os.path.join(self._tmp_dir, f"part-{bucket}.parquet"))
+                for bucket in sorted(self._writers)
+            ]
+            return pd.concat(frames, ignore_index=True) if frames else self.schema.empty_table().to_pandas()
+        finally:
+            self.close()
+
+    def close(self):
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        self._writers = {}
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+
+def load_out_of_core(
+    path: str,
+    apply_filters: Callable[[pd.DataFrame, dict], pd.DataFrame],
+    filters: dict = None,
+    time_bucket: dict = None,
+    only_latest: dict = None,
+    distinct: bool = False,
+    group_by: List[str] = None,
+    order_by: str = None,
+    order: str = "asc",
+    limit: int = None,
+    memory_budget: int = 256 * 1024 * 1024,
+    spill_dir: Optional[str] = None,
+    partitions: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate a ParquetLoader query one row group at a time.
+
+    The first reducing stage (time_bucket, only_latest, distinct or group_by,
+    in the pandas engine's order) runs streaming through a `SpillingReducer`;
+    later stages run on its output, whose size is bounded by key cardinality.
+    A plain scan with `order_by` and `limit` keeps only a running top-k.
+
+    :return: Dictionary with the result DataFrame under "frame" plus "spilled" and "spilled_rows"
+    """
+    parquet_file = pq.ParquetFile(path)
+    schema = parquet_file.schema_arrow
+    columns = schema.names
+
+    # Streaming stage; later stages are applied to its (small) result.
+    reducer = None
+    remaining = {"only_latest": only_latest, "distinct": distinct, "group_by": group_by}
+    transform = None
+    if time_bucket and "timestamp_updated" in columns:
+        bucket_interval = time_bucket.get("bucket_interval")
+        bucket_timestamp = time_bucket.get("bucket_timestamp")
+        distinct_column = time_bucket.get("distinct_column")
+
+        def transform(df):
+            df = df.assign(time_bucket=pd.to_datetime(df[bucket_timestamp]).dt.floor(bucket_interval))
+            return df[["time_bucket", distinct_column]]
+
+        bucket_schema = pa.schema([pa.field("time_bucket", pa.timestamp("ns")), schema.field(distinct_column)])
+        reducer = SpillingReducer(["time_bucket", distinct_column], bucket_schema, memory_budget, None, partitions, spill_dir)
+    elif only_latest and only_latest.get("timestamp_column") in columns and only_latest.get("latest_on") in columns:
+        timestamp_column = only_latest["timestamp_column"]
+        latest_on = only_latest["latest_on"]
+
+        def newest_first(df):
+            order_key = pd.to_datetime(df[timestamp_column])
+            return df.iloc[order_key.reset_index(drop=True).sort_values(ascending=False, kind="stable").index]
+
+        reducer = SpillingReducer([latest_on], schema, memory_budget, newest_first, partitions, spill_dir)
+        remaining["only_latest"] = None
+    elif distinct:
+        reducer = SpillingReducer(columns, schema, memory_budget, None, partitions, spill_dir)
+        remaining["distinct"] = False
+    elif group_by:
+        # First row per group in file order, as groupby(...).agg(lambda x: x.iloc[0]) keeps.
+        reducer = SpillingReducer(list(group_by), schema, memory_budget, None, partitions, spill_dir)
+        remaining["group_by"] = None
+
+    topk = None
+    try:
+        for i in range(parquet_file.num_row_groups):
+            df = parquet_file.read_row_group(i).to_pandas()
+            if filters:
+                df = apply_filters(df, filters)
+            if reducer is not None:
+                if transform is not None:
+                    df = transform(df)
+                reducer.add(df)
+            elif order_by and limit:
+                topk = df if topk is None else pd.concat([topk, df], ignore_index=True)
+                topk = topk.sort_values(by=order_by, ascending=(order == "asc"), kind="stable").head(limit)
+            else:
+                topk = df if topk is None else pd.concat([topk, df], ignore_index=True)
+
+        if reducer is not None:
+            df = reducer.results()
+            if transform is not None:
+                if not time_bucket.get("keep_bucket"):
+                    df = df[[time_bucket.get("distinct_column")]]
+            elif only_latest and remaining["only_latest"] is None:
+                # Match the pandas engine: parsed timestamps, ordered by the latest_on key.
+                df[timestamp_column] = pd.to_datetime(df[timestamp_column])
+                df = df.sort_values(by=[latest_on, timestamp_column], ascending=[True, False])
+        else:
+            df = topk if topk is not None else schema.empty_table().to_pandas()
+    finally:
+        if reducer is not None:
+            reducer.close()
+
+    if remaining["only_latest"]:
+        timestamp_column = only_latest["timestamp_column"]
+        latest_on = only_latest["latest_on"]
+        if timestamp_column in df.columns and latest_on in df.columns:
+            df[timestamp_column] = pd.to_datetime(df[timestamp_column])
+            df = df.sort_values(by=[latest_on, timestamp_column], ascending=[True, False])
+            df = df.drop_duplicates(subset=[latest_on], keep="first")
+        else:
+            print(f"⚠ Warning: Columns '{timestamp_column}' or '{latest_on}' not found.")
+    if remaining["distinct"]:
+        df = df.drop_duplicates()
+    if remaining["group_by"]:
+        df = df.groupby(remaining["group_by"], as_index=False).agg(lambda x: x.iloc[0])
+    elif group_by:
+        # Same shape as groupby(..., as_index=False): group columns first, sorted by them.
+        group_by = list(group_by)
+        df = df[group_by + [col for col in df.columns if col not in group_by]]
+        df = df.sort_values(by=group_by, kind="stable").reset_index(drop=True)
+
+    if order_by:
+        df = df.sort_values(by=order_by, ascending=(order == "asc"))
+    if limit:
+        df = df.head(limit)
+
+    return {
+        "frame": df,
+        "spilled": reducer.spilled if reducer is not None else False,
+        "spilled_rows": reducer.spilled_rows if reducer is not None else 0,
+    }
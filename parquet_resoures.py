@@ -1,20 +1,61 @@
 import os
+import uuid
 import pandas as pd
-import pyarrow.parquet as pq
-import sqlalchemy as sa
-from sqlalchemy.orm import Session
-from typing import Any, List, Dict
-from typing import Any, List, Dict, Optional, Type, Union, Tuple
-import maya
+from typing import Any, List, Dict, Tuple
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
-
-import pandas as pd
+from sql_filters import filter_conditions
 
 
 class ParquetLoader:
-    def __init__(self, storage_path: str):
+    def __init__(
+        self,
+        storage_path: str,
+        engine: str = "pandas",
+        catalog=None,
+        memory_budget: int = 256 * 1024 * 1024,
+        spill_dir: str = None,
+        versioned: bool = False,
+        keep_versions: int = 3,
+        retention_seconds: float = 300,
+        publish_head: bool = True,
+        sketches: bool = False,
+        sketch_options: dict = None,
+    ):
+        """
+        :param storage_path: Parquet file, or directory holding one file per table
+        :param engine: "pandas" materializes the file and filters in pandas;
+            "duckdb" runs the query through DuckDB's `read_parquet` so filters,
+            only_latest, group_by and time_bucket are pushed into the scan;
+            "out_of_core" streams row groups and keeps only per-key state,
+            spilling to `spill_dir` past `memory_budget` bytes
+        :param versioned: Write each upsert as a new immutable version and read
+            the newest one, see `parquet_snapshots.VersionedParquetTable`;
+            off by default, which keeps the single-file layout
+        :param publish_head: With `versioned`, also copy each version over the
+            plain table file for tools that read it directly (one extra write per commit)
+        :param keep_versions: Newest versions kept by garbage collection
+        :param retention_seconds: Minimum age of a superseded version before it is removed
+        :param sketches: Maintain the approximate-query sketches on every `upsert_data`
+        :param sketch_options: `approximate_query.SketchStore` settings (partitioning, columns, sizes)
+        """
+        if engine not in ("pandas", "duckdb", "out_of_core"):
+            raise ValueError(f"Unsupported engine: {engine}")
         self.storage_path = storage_path
+        self.engine = engine
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.versioned = versioned
+        self.keep_versions = keep_versions
+        self.retention_seconds = retention_seconds
+        self.publish_head = publish_head
+        self._tables = {}
+        self.max_commit_retries = 10
+        self.sketches = sketches
+        self.sketch_options = sketch_options or {}
+        self.catalog = catalog
+        self._duckdb_pool = None
         self.logger = None  
     
 
@@ -36,54 +77,66 @@ class ParquetLoader:
     log_sample_values: bool = False,
     pretty_print: bool = True,
     logger=None,
+    partition: dict = None,
+    engine: str = None,
+    snapshot: Any = None,
 ) -> List[Dict[str, Any]]:
-    
-   
-        table_path = (
-            self.storage_path if os.path.isfile(self.storage_path) 
-            else os.path.join(self.storage_path, selected_columns_or_path)
-        )
+        """
+        Load data from a Parquet file with filtering, sorting, and grouping.
+
+        `partition` restricts the read to row groups, files or a key range, see
+        `parallel_scan.parallel_load_data`. `engine` overrides the loader's
+        default execution engine for this call. `time_bucket` may set
+        "keep_bucket" to return the bucket alongside the distinct column. `snapshot` reads a version
+        pinned with `snapshot()` instead of the newest one.
+        """
+        table_path = snapshot.path if snapshot is not None else self._resolve_table_path(selected_columns_or_path)
         print("parquet")
        
         if not os.path.exists(table_path):
             print(f"❌ Error: Parquet file '{table_path}' does not exist!")
             return []
 
+        engine = engine or self.engine
+        if engine == "duckdb" and not (partition and "row_groups" in partition):
+            try:
+                return self._load_with_duckdb(
+                    table_path, time_bucket, group_by, filters, limit, offset,
+                    order_by, order, distinct, only_latest, log_statement, partition,
+                )
+            except Exception as e:
+                print(f"❌ Error loading Parquet file: {e}")
+                return []
+
+        if engine == "out_of_core" and not partition:
+            from parquet_out_of_core import load_out_of_core
+
+            try:
+                if offset:
+                    raise ValueError("OFFSET will not work with parquet system")
+                result = load_out_of_core(
+                    table_path, self._apply_filters, filters=filters, time_bucket=time_bucket,
+                    only_latest=only_latest, distinct=distinct, group_by=group_by, order_by=order_by,
+                    order=order, limit=limit, memory_budget=self.memory_budget, spill_dir=self.spill_dir,
+                )
+                return result["frame"].to_dict("records")
+            except Exception as e:
+                print(f"❌ Error loading Parquet file: {e}")
+                return []
+
        
         try:
-            df = pq.read_table(table_path).to_pandas()
+            if partition:
+                df = self._read_partition(table_path, partition)
+            else:
+                df = pq.read_table(table_path).to_pandas()
              
 
             if offset:
                 raise ValueError("OFFSET will not work with parquet system")
            
             if filters:
-                for column, value in filters.items():
-                    if column not in df.columns:
-                        raise ValueError(f"Column '{column}' not found in DataFrame")
-
-                    if isinstance(value, list):  
-                        df = df[df[column].isin(value)]
-
-                    elif isinstance(value, dict):  
-                        for op, val in value.items():
-                            if op == "==":
-                                df = df[df[column] == val]
-                            elif op == "!=":
-                                df = df[df[column] != val]
-                            elif op == ">":
-                                df = df[df[column] > val]
-                            elif op == ">=":
-                                df = df[df[column] >= val]
-                            elif op == "<":
-                                df = df[df[column] < val]
-                            elif op == "<=":
-                                df = df[df[column] <= val]
-                            else:
-                                raise ValueError(f"Unsupported operator: {op}")
-                        return df
-                    else: 
-                        df = df[df[column] == value]
+                df = self._apply_filters(df, filters)
 
          
             if time_bucket and "timestamp_updated" in df.columns:
@@ -95,7 +148,9 @@ class ParquetLoader:
                 distinct_column = time_bucket.get("distinct_column")
 
                 df["time_bucket"] = df[bucket_timestamp].dt.floor(bucket_interval)
-                df = df.drop_duplicates(subset=["time_bucket", distinct_column])[[distinct_column]]
+                df = df.drop_duplicates(subset=["time_bucket", distinct_column])
+                # `keep_bucket` returns the bucket too, so results can be merged across partitions.
+                df = df[["time_bucket", distinct_column] if time_bucket.get("keep_bucket") else [distinct_column]]
 
            
             if only_latest:
@@ -128,6 +183,251 @@ class ParquetLoader:
             print(f"❌ Error loading Parquet file: {e}")
             return []
 
+    @staticmethod
+    def _apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+        for column, value in filters.items():
+            if column not in df.columns:
+                raise ValueError(f"Column '{column}' not found in DataFrame")
+
+            if isinstance(value, list):  
+                df = df[df[column].isin(value)]
+
+            elif isinstance(value, dict):  
+                for op, val in value.items():
+                    if op == "==":
+                        df = df[df[column] == val]
+                    elif op == "!=":
+                        df = df[df[column] != val]
+                    elif op == ">":
+                        df = df[df[column] > val]
+                    elif op == ">=":
+                        df = df[df[column] >= val]
+                    elif op == "<":
+                        df = df[df[column] < val]
+                    elif op == "<=":
+                        df = df[df[column] <= val]
+                    else:
+                        raise ValueError(f"Unsupported operator: {op}")
+            else: 
+                df = df[df[column] == value]
+        return df
+
+    def duckdb_cursor(self):
+        """Return the calling thread's cursor on the loader's in-memory DuckDB instance."""
+        if self._duckdb_pool is None:
+            import duckdb
+            from Duckdb_resourcers import DuckDBCursorPool
+
+            self._duckdb_pool = DuckDBCursorPool(duckdb.connect(database=":memory:"))
+        return self._duckdb_pool.cursor()
+
+    def _columns(self, table_path: str) -> List[str]:
+        if self.catalog is None:
+            from schema_catalog import default_catalog
+
+            self.catalog = default_catalog
+        return self.catalog.columns(self.catalog.parquet_describe(table_path))
+
+    def build_duckdb_query(
+        self, table_path, time_bucket=None, group_by=None, filters=None, limit=None,
+        order_by=None, order="asc", distinct=False, only_latest=None, partition=None,
+    ) -> Tuple[str, list]:
+        """
+        Translate `load_data` arguments into one DuckDB query over `read_parquet`.
+
+        Stages are applied in the same order as the pandas engine.
+        :return: Tuple of (SQL, bound parameters)
+        """
+        params = []
+        if partition and "files" in partition:
+            params.append(list(partition["files"]))
+        else:
+            params.append(table_path)
+        query = "SELECT * FROM read_parquet(?)"
+        columns = self._columns(table_path)
+
+        conditions, filter_params = filter_conditions(filters, columns=columns)
+        params.extend(filter_params)
+
+        if partition and "column" in partition:
+            column = partition["column"]
+            if "modulus" in partition:
+                conditions.append(f'abs("{column}") % {int(partition["modulus"])} = {int(partition["remainder"])}')
+            else:
+                if partition.get("lower") is not None:
+                    conditions.append(f'"{column}" >= ?')
+                    params.append(partition["lower"])
+                if partition.get("upper") is not None:
+                    conditions.append(f'"{column}" < ?')
+                    params.append(partition["upper"])
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        if time_bucket and "timestamp_updated" in columns:
+            bucket_seconds = int(pd.Timedelta(time_bucket.get("bucket_interval")).total_seconds())
+            bucket_timestamp = time_bucket.get("bucket_timestamp")
+            distinct_column = time_bucket.get("distinct_column")
+            query = f"""
+                SELECT {'time_bucket, ' if time_bucket.get("keep_bucket") else ''}"{distinct_column}" FROM (
+                    SELECT DISTINCT
+                        time_bucket(INTERVAL '{bucket_seconds} seconds', CAST("{bucket_timestamp}" AS TIMESTAMP), TIMESTAMP '1970-01-01') AS time_bucket,
+                        "{distinct_column}"
+                    FROM ({query})
+                )
+            """
+            columns = ["time_bucket", distinct_column] if time_bucket.get("keep_bucket") else [distinct_column]
+
+        if only_latest:
+            timestamp_column = only_latest["timestamp_column"]
+            latest_on = only_latest["latest_on"]
+            if timestamp_column in columns and latest_on in columns:
+                # The pandas engine returns the timestamp parsed, so cast it here too.
+                query = f"""
+                    SELECT * REPLACE (CAST("{timestamp_column}" AS TIMESTAMP) AS "{timestamp_column}")
+                    FROM ({query})
+                    QUALIFY ROW_NUMBER() OVER (
+                        PARTITION BY "{latest_on}" ORDER BY CAST("{timestamp_column}" AS TIMESTAMP) DESC
+                    ) = 1
+                """
+            else:
+                print(f"⚠ Warning: Columns '{timestamp_column}' or '{latest_on}' not found.")
+
+        if distinct:
+            query = f"SELECT DISTINCT * FROM ({query})"
+
+        if group_by:
+            select_list = [f'"{col}"' for col in group_by] + [
+                f'FIRST("{col}") AS "{col}"' for col in columns if col not in group_by
+            ]
+            group_clause = ", ".join(f'"{col}"' for col in group_by)
+            query = f"SELECT {', '.join(select_list)} FROM ({query}) GROUP BY {group_clause}"
+
+        if order_by:
+            query += f' ORDER BY "{order_by}" {"ASC" if order == "asc" else "DESC"}'
+
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        return query, params
+
+    def _load_with_duckdb(
+        self, table_path, time_bucket, group_by, filters, limit, offset,
+        order_by, order, distinct, only_latest, log_statement, partition,
+    ) -> List[Dict[str, Any]]:
+        if offset:
+            raise ValueError("OFFSET will not work with parquet system")
+        query, params = self.build_duckdb_query(
+            table_path, time_bucket=time_bucket, group_by=group_by, filters=filters, limit=limit,
+            order_by=order_by, order=order, distinct=distinct, only_latest=only_latest, partition=partition,
+        )
+        if log_statement:
+            print(f"Executing Query: {query}")
+        return self.duckdb_cursor().execute(query, params).fetchdf().to_dict("records")
+
+    def _table_path(self, selected_columns_or_path: Any) -> str:
+        if os.path.isfile(self.storage_path) or selected_columns_or_path is None:
+            return self.storage_path
+        # A versioned table may have no plain file (`publish_head=False`).
+        if self.versioned and (
+            os.path.isdir(self.storage_path + "_versions") or os.path.abspath(self.storage_path) in self._tables
+        ):
+            return self.storage_path
+        return os.path.join(self.storage_path, selected_columns_or_path)
+
+    def _resolve_table_path(self, selected_columns_or_path: Any) -> str:
+        """Return the file holding the newest version of the table."""
+        return self._resolve_table_path_for(self._table_path(selected_columns_or_path))
+
+    def versions(self, table_path: str):
+        """Return the `VersionedParquetTable` for a logical table path."""
+        from parquet_snapshots import VersionedParquetTable
+
+        key = os.path.abspath(table_path)
+        if key not in self._tables:
+            self._tables[key] = VersionedParquetTable(
+                table_path, keep_versions=self.keep_versions, retention_seconds=self.retention_seconds,
+                publish_head=self.publish_head,
+            )
+        return self._tables[key]
+
+    def snapshot(self, selected_columns_or_path: Any = None, version: int = None):
+        """
+        Pin a version of the table for repeatable reads; pass it to
+        `load_data(snapshot=...)` and release it (or use it as a context manager).
+        """
+        return self.versions(self._table_path(selected_columns_or_path)).pin(version)
+
+    def vacuum(self, selected_columns_or_path: Any = None) -> List[int]:
+        """Garbage-collect old versions of the table; returns the versions removed."""
+        return self.versions(self._table_path(selected_columns_or_path)).gc()
+
+    def _read_partition(self, table_path: str, partition: dict) -> pd.DataFrame:
+        if "files" in partition:
+            return pa.concat_tables([pq.read_table(path) for path in partition["files"]]).to_pandas()
+        if "row_groups" in partition:
+            return pq.ParquetFile(table_path).read_row_groups(partition["row_groups"]).to_pandas()
+
+        column = partition["column"]
+        if "modulus" in partition:
+            # Parquet has no hash pushdown; each worker still decodes the file
+            # but only keeps its share of keys for the downstream pandas ops.
+            df = pq.read_table(table_path).to_pandas()
+            return df[df[column].abs() % partition["modulus"] == partition["remainder"]]
+
+        arrow_filters = []
+        if partition.get("lower") is not None:
+            arrow_filters.append((column, ">=", partition["lower"]))
+        if partition.get("upper") is not None:
+            arrow_filters.append((column, "<", partition["upper"]))
+        return pq.read_table(table_path, filters=arrow_filters or None).to_pandas()
+
+    def optimize_layout(self, selected_columns_or_path: Any = None, **kwargs) -> Dict[str, Any]:
+        """
+        Cluster the table's file, see `parquet_layout.optimize_parquet`.
+
+        A versioned table gets the clustered file as a new version.
+        """
+        from parquet_layout import optimize_parquet
+
+        if not self.versioned:
+            return optimize_parquet(self._table_path(selected_columns_or_path), **kwargs)
+
+        from parquet_snapshots import CommitConflict
+
+        table = self.versions(self._table_path(selected_columns_or_path))
+        with table.pin() as snapshot:
+            os.makedirs(table.versions_dir, exist_ok=True)
+            tmp_path = os.path.join(table.versions_dir, f".tmp-optimize-{os.getpid()}.parquet")
+            result = optimize_parquet(snapshot.path, output=tmp_path, **kwargs)
+            try:
+                result["version"] = table.commit_file(tmp_path, snapshot.version)
+            except CommitConflict as e:
+                # Rewriting a stale version would drop the concurrent commit.
+                return {"success": False, "message": str(e)}
+        result["path"] = table.version_path(result["version"])
+        return result
+
+    def row_group_count(self, selected_columns_or_path: Any = None, snapshot: Any = None) -> int:
+        """Return the number of row groups in the Parquet file."""
+        path = snapshot.path if snapshot is not None else self._resolve_table_path(selected_columns_or_path)
+        return pq.ParquetFile(path).num_row_groups
+
+    def column_bounds(self, selected_columns_or_path: Any, column: str, snapshot: Any = None):
+        """Return (min, max) of `column` from row-group statistics."""
+        path = snapshot.path if snapshot is not None else self._resolve_table_path(selected_columns_or_path)
+        metadata = pq.ParquetFile(path).metadata
+        index = metadata.schema.to_arrow_schema().get_field_index(column)
+        lows, highs = [], []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(index).statistics
+            if stats is None or not stats.has_min_max:
+                column_values = pq.read_table(path, columns=[column])[column]
+                return (pc.min(column_values).as_py(), pc.max(column_values).as_py())
+            lows.append(stats.min)
+            highs.append(stats.max)
+        return (min(lows), max(highs)) if lows else (None, None)
+
     def _get_table_path(self, table_name: str) -> str:
         """Construct the path to the Parquet file for a given table name."""
         return os.path.join(self.base_path, f"{table_name}.parquet")
@@ -139,6 +439,7 @@ class ParquetLoader:
         - Updates existing records if they match `id_fields` or `unique_fields`
         - Inserts new records if they don’t exist
         - Prevents updating columns listed in `no_update_cols`
+        - With `versioned`, commits the result as a new immutable version
         
         :param model: Path to the Parquet file (acts as the table)
         :param data: List of dictionaries (records to upsert)
@@ -155,46 +456,146 @@ class ParquetLoader:
        
         unique_fields = unique_fields if unique_fields else []
         subset_keys = id_fields + unique_fields 
-        if os.path.exists(table_path):
-           
-            existing_data_df = pq.read_table(table_path).to_pandas()
 
-          
-            existing_row_count = len(existing_data_df)
+        if self.versioned:
+            from parquet_snapshots import CommitConflict
 
-           
-            merged_df = pd.concat([existing_data_df, new_data_df]).drop_duplicates(
-                subset=subset_keys, keep="last"
+            table = self.versions(table_path)
+            for _ in range(self.max_commit_retries):
+                # Merge on top of a pinned version; if another writer commits
+                # first, re-read its version and merge again.
+                with table.pin() as snapshot:
+                    existing_data_df = pq.read_table(snapshot.path).to_pandas() if os.path.exists(snapshot.path) else None
+                    merged_df, inserted_rows, updated_rows = self._merge_upsert(
+                        existing_data_df, new_data_df, subset_keys, no_update_cols
+                    )
+                    try:
+                        base_version = snapshot.version
+                        version = table.commit(pa.Table.from_pandas(merged_df, preserve_index=False), base_version)
+                        break
+                    except CommitConflict:
+                        continue
+            else:
+                return {"success": False, "message": f"Gave up after {self.max_commit_retries} conflicting commits"}
+        else:
+            base_version = self._table_version(table_path)
+            existing_data_df = pq.read_table(table_path).to_pandas() if os.path.exists(table_path) else None
+            merged_df, inserted_rows, updated_rows = self._merge_upsert(
+                existing_data_df, new_data_df, subset_keys, no_update_cols
             )
+            # Write next to the table and rename, so readers never see a partial file.
+            tmp_path = f"{table_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                merged_df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, table_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            version = self._table_version(table_path)
 
-           
-            if "timestamp_updated" in merged_df.columns:
-                merged_df = merged_df.sort_values(by="timestamp_updated").drop_duplicates(
-                    subset=subset_keys, keep="last"
+        if self.sketches:
+            try:
+                store = self._sketch_store(table_path)
+                store.apply(
+                    new_data_df, base_version, version,
+                    lambda: pq.read_table(self._resolve_table_path_for(table_path)).to_pandas(),
+                    replaced_rows=max(len(new_data_df) - inserted_rows, 0),
                 )
+                store.save()
+            except Exception as e:
+                # The data is committed; stale sketches are rebuilt on the next query.
+                print(f"⚠ Warning: Could not update sketches for '{table_path}': {e}")
 
-           
-            if no_update_cols:
-                for col in no_update_cols:
-                    if col in existing_data_df.columns:
-                        merged_df[col] = existing_data_df[col]
+        
+        if return_counts:
+            return {"success": True, "inserted_rows": inserted_rows, "updated_rows": updated_rows}
+        
+        return {"success": True}
 
-           
-            new_row_count = len(merged_df)
-            inserted_rows = new_row_count - existing_row_count
-            updated_rows = existing_row_count - len(existing_data_df)
+    def _table_version(self, table_path: str) -> Any:
+        if self.versioned:
+            return self.versions(table_path).latest_version()
+        return os.stat(table_path).st_mtime_ns if os.path.exists(table_path) else None
 
-        else:
-           
-            merged_df = new_data_df
-            inserted_rows = len(new_data_df)
-            updated_rows = 0
+    def _resolve_table_path_for(self, table_path: str) -> str:
+        return self.versions(table_path).current_path() if self.versioned else table_path
+
+    def _sketch_store(self, table_path: str):
+        from approximate_query import SketchStore
+
+        return SketchStore.open(table_path + ".sketches.npz", **self.sketch_options)
+
+    def approximate(
+        self, kind: str, selected_columns_or_path: Any = None, refresh: bool = True, max_drift: float = 0.05, **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Answer a dashboard query from sketches instead of scanning the table.
+
+        :param kind: "distinct" (HyperLogLog, see `SketchStore.distinct`),
+            "quantiles" (KLL, see `SketchStore.quantiles`) or "sample"
+            (reservoir sample with `load_data`-style filters, see `SketchStore.sample_estimate`)
+        :param refresh: Rebuild sketches that are missing, older than the table,
+            or whose replaced rows exceed `max_drift` of the rows ingested
+        :return: Dictionary with success status, "results" with error bounds,
+            the table "version" the sketches reflect, the "replaced_rows" folded
+            in since the last rebuild and whether the sketches are "stale"
+            (older than the table, or overcounting replaced rows)
+        """
+        try:
+            table_path = self._table_path(selected_columns_or_path)
+            store = self._sketch_store(table_path)
+            version = self._table_version(table_path)
+            if refresh and (store.version != version or store.drift > max_drift):
+                store.rebuild(pq.read_table(self._resolve_table_path_for(table_path)).to_pandas(), version)
+                store.save()
+
+            if kind == "distinct":
+                results = store.distinct(**kwargs)
+            elif kind == "quantiles":
+                results = store.quantiles(**kwargs)
+            elif kind == "sample":
+                results = store.sample_estimate(apply_filters=self._apply_filters, **kwargs)
+            else:
+                raise ValueError(f"Unsupported approximate query: {kind}")
+            return {
+                "success": True,
+                "results": results,
+                "version": store.version,
+                "replaced_rows": store.replaced_rows,
+                "stale": store.version != version or store.replaced_rows > 0,
+            }
+        except Exception as e:
+            print(f"❌ Error running approximate query: {e}")
+            return {"success": False, "message": str(e)}
+
+    @staticmethod
+    def _merge_upsert(existing_data_df, new_data_df, subset_keys, no_update_cols):
+        """Return (merged DataFrame, inserted rows, updated rows)."""
+        if existing_data_df is None:
+            return new_data_df, len(new_data_df), 0
+
+        existing_row_count = len(existing_data_df)
 
        
-        merged_df.to_parquet(table_path, index=False)
+        merged_df = pd.concat([existing_data_df, new_data_df]).drop_duplicates(
+            subset=subset_keys, keep="last"
+        )
 
-        
-        if return_counts:
-            return {"success": True, "inserted_rows": inserted_rows, "updated_rows": updated_rows}
-        
-        return {"success": True}
\ No newline at end of file
+       
+        if "timestamp_updated" in merged_df.columns:
+            merged_df = merged_df.sort_values(by="timestamp_updated").drop_duplicates(
+                subset=subset_keys, keep="last"
+            )
+
+       
+        if no_update_cols:
+            for col in no_update_cols:
+                if col in existing_data_df.columns:
+                    merged_df[col] = existing_data_df[col]
+
+       
+        new_row_count = len(merged_df)
+        inserted_rows = new_row_count - existing_row_count
+        updated_rows = existing_row_count - len(existing_data_df)
+        return merged_df, inserted_rows, updated_rows
\ No newline at end of file
@@ -0,0 +1,320 @@
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+_VERSION_FILE = re.compile(r"^v(\d{20})\.parquet$")
+_PIN_FILE = re.compile(r"^(\d+)-(\d+)-[0-9a-f]+\.pin$")
+
+
+class CommitConflict(Exception):
+    """Another writer published the version this commit was going to create."""
+
+
+class Snapshot:
+    """
+    One pinned, immutable version of a Parquet table.
+
+    While pinned, the version file is not garbage-collected, so every read
+    through `path` sees the same data no matter how many commits land.
+    Snapshots are picklable; only the creating process removes the pin.
+    """
+
+    def __init__(self, version: int, path: str, pin_path: Optional[str] = None):
+        self.version = version
+        self.path = path
+        self.pin_path = pin_path
+        self._owner = os.getpid()
+
+    def release(self):
+        if self.pin_path and self._owner == os.getpid():
+            try:
+                os.remove(self.pin_path)
+            except FileNotFoundError:
+                pass
+            self.pin_path = None
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __repr__(self):
+        return f"Snapshot(version={self.version}, path={self.path!r})"
+
+
+class VersionedParquetTable:
+    """
+    Copy-on-write versions of one Parquet table with lock-free readers.
+
+    Every commit writes a new immutable file `<path>_versions/v<N>.parquet`.
+    The file is written under a temporary name and published with `os.link`,
+    which fails if version N already exists, so concurrent writers never
+    overwrite each other: the loser gets `CommitConflict` and retries on top
+    of the new version. Readers list the directory, take the highest version
+    and open that file; they never see a partial write and never block.
+
+    `path` itself is refreshed with an atomic rename after each commit, so
+    tools that read the plain file keep working. A table with no versions yet
+    reads `path` directly, and its first commit becomes version 1.
+
+    Writers of the plain file: `path` has a single writer at a time, and it
+    must replace the file (write elsewhere, then rename) or write it in place
+    while no reader runs. Every copy published to `path` leaves a marker in
+    `heads/` named after its inode, size and mtime; a `path` without a marker
+    was written by another tool (`cli.py convert`, `df.to_parquet`) and is
+    adopted as the next version on the next read or pin instead of being
+    overwritten.
+
+    Old versions are removed by `gc` once they are outside the newest
+    `keep_versions`, have been superseded for `retention_seconds`, and are not
+    pinned by a live process.
+    """
+
+    def __init__(self, path: str, keep_versions: int = 3, retention_seconds: float = 300, publish_head: bool = True):
+        """
+        :param path: Logical table path, e.g. "data.parquet"
+        :param keep_versions: Newest versions always kept by `gc`
+        :param retention_seconds: Grace period for readers that resolved a version but have not opened it yet
+        :param publish_head: Also replace `path` with a copy of each new version
+        """
+        self.path = path
+        self.versions_dir = path + "_versions"
+        self.pins_dir = os.path.join(self.versions_dir, "pins")
+        self.heads_dir = os.path.join(self.versions_dir, "heads")
+        self.keep_versions = keep_versions
+        self.retention_seconds = retention_seconds
+        self.publish_head = publish_head
+
+    # Reading
+
+    def version_path(self, version: int) -> str:
+        return os.path.join(self.versions_dir, f"v{version:020d}.parquet")
+
+    def versions(self) -> List[int]:
+        """Return the committed versions, oldest first."""
+        try:
+            names = os.listdir(self.versions_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(int(m.group(1)) for m in map(_VERSION_FILE.match, names) if m)
+
+    def latest_version(self) -> int:
+        """Return the newest version, or 0 for a table without versions."""
+        versions = self.versions()
+        return versions[-1] if versions else 0
+
+    def current_path(self) -> str:
+        """Return the file holding the newest version."""
+        self.adopt_head()
+        version = self.latest_version()
+        return self.version_path(version) if version else self.path
+
+    @staticmethod
+    def _head_marker(path: str) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return f"{st.st_ino}-{st.st_size}-{st.st_mtime_ns}"
+
+    def _head_changed(self) -> bool:
+        """Whether `path` was written by something other than `_publish_head`."""
+        if not self.publish_head or not os.path.isdir(self.heads_dir):
+            return False
+        marker = self._head_marker(self.path)
+        return marker is not None and not os.path.exists(os.path.join(self.heads_dir, marker))
+
+    def adopt_head(self) -> Optional[int]:
+        """
+        Commit an externally rewritten `path` as a new version.
+
+        :return: The adopted version, or None when `path` is unchanged
+        """
+        for _ in range(5):
+            if not self._head_changed():
+                return None
+            base_version = self.latest_version()
+            os.makedirs(self.versions_dir, exist_ok=True)
+            tmp_path = os.path.join(self.versions_dir, f".tmp-{uuid.uuid4().hex}.parquet")
+            try:
+                shutil.copyfile(self.path, tmp_path)
+                return self.commit_file(tmp_path, base_version)
+            except CommitConflict:
+                continue
+        return None
+
+    def pin(self, version: int = None) -> Snapshot:
+        """
+        Pin `version` (default: the newest) so `gc` keeps it until released.
+
+        :raises ValueError: If the version does not exist
+        """
+        if version is None:
+            self.adopt_head()
+        for _ in range(5):
+            pinned = version or self.latest_version()
+            if not pinned:
+                return Snapshot(0, self.path)
+            os.makedirs(self.pins_dir, exist_ok=True)
+            pin_path = os.path.join(self.pins_dir, f"{pinned}-{os.getpid()}-{uuid.uuid4().hex}.pin")
+            open(pin_path, "w").close()
+            # The pin only counts if the version survived until it was written.
+            if os.path.exists(self.version_path(pinned)):
+                return Snapshot(pinned, self.version_path(pinned), pin_path)
+            os.remove(pin_path)
+            if version:
+                break
+        raise ValueError(f"Version {version} of '{self.path}' does not exist")
+
+    def read(self, snapshot: Snapshot = None) -> pa.Table:
+        return pq.read_table(snapshot.path if snapshot else self.current_path())
+
+    # Writing
+
+    def commit(self, table: pa.Table, base_version: int, **write_kwargs) -> int:
+        """
+        Publish `table` as version `base_version + 1`.
+
+        :raises CommitConflict: If another writer already published that version
+        """
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp_path = os.path.join(self.versions_dir, f".tmp-{uuid.uuid4().hex}.parquet")
+        pq.write_table(table, tmp_path, **write_kwargs)
+        return self.commit_file(tmp_path, base_version)
+
+    def commit_file(self, tmp_path: str, base_version: int) -> int:
+        """
+        Publish an already written Parquet file as version `base_version + 1`.
+
+        `tmp_path` must be on the same filesystem as the table; it is consumed.
+        :raises CommitConflict: If another writer already published that version
+        """
+        os.makedirs(self.versions_dir, exist_ok=True)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+
+        version = base_version + 1
+        target = self.version_path(version)
+        try:
+            os.link(tmp_path, target)
+        except FileExistsError:
+            os.remove(tmp_path)
+            raise CommitConflict(f"Version {version} of '{self.path}' was committed concurrently")
+        except OSError:
+            # Filesystem without hard links: exclusive create is no longer
+            # atomic with the write, so fall back to check-then-rename.
+            if os.path.exists(target):
+                os.remove(tmp_path)
+                raise CommitConflict(f"Version {version} of '{self.path}' was committed concurrently")
+            os.replace(tmp_path, target)
+        else:
+            os.remove(tmp_path)
+
+        if self.publish_head:
+            self._publish_head()
+        self.gc()
+        return version
+
+    def _publish_head(self):
+        # Another writer may publish an older version after ours; re-check
+        # until `path` holds the newest one so the last writer to finish wins.
+        published = None
+        while True:
+            latest = self.latest_version()
+            if latest == published:
+                return
+            tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            try:
+                shutil.copyfile(self.version_path(latest), tmp_path)
+            except FileNotFoundError:
+                return
+            # Mark the copy before it becomes `path`, so no reader mistakes it
+            # for an external write; rename keeps inode, size and mtime.
+            os.makedirs(self.heads_dir, exist_ok=True)
+            open(os.path.join(self.heads_dir, self._head_marker(tmp_path)), "w").close()
+            os.replace(tmp_path, self.path)
+            published = latest
+
+    # Garbage collection
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def pinned_versions(self) -> set:
+        """Return versions pinned by live processes, removing pins of dead ones."""
+        pinned = set()
+        try:
+            names = os.listdir(self.pins_dir)
+        except FileNotFoundError:
+            return pinned
+        for name in names:
+            match = _PIN_FILE.match(name)
+            if not match:
+                continue
+            if self._alive(int(match.group(2))):
+                pinned.add(int(match.group(1)))
+            else:
+                try:
+                    os.remove(os.path.join(self.pins_dir, name))
+                except FileNotFoundError:
+                    pass
+        return pinned
+
+    def gc(self) -> List[int]:
+        """Remove expired, unpinned versions; return the versions removed."""
+        versions = self.versions()
+        pinned = self.pinned_versions()
+        now = time.time()
+        removed = []
+        for i, version in enumerate(versions[: -self.keep_versions] if self.keep_versions else versions[:-1]):
+            if version in pinned:
+                continue
+            try:
+                superseded_at = os.path.getmtime(self.version_path(versions[i + 1]))
+            except FileNotFoundError:
+                continue
+            if now - superseded_at < self.retention_seconds:
+                continue
+            try:
+                os.remove(self.version_path(version))
+                removed.append(version)
+            except FileNotFoundError:
+                pass
+
+        # Markers of heads that have since been replaced.
+        current_head = self._head_marker(self.path)
+        for name in os.listdir(self.heads_dir) if os.path.isdir(self.heads_dir) else []:
+            marker_path = os.path.join(self.heads_dir, name)
+            try:
+                if name != current_head and now - os.path.getmtime(marker_path) > self.retention_seconds:
+                    os.remove(marker_path)
+            except FileNotFoundError:
+                pass
+
+        # Temporary files left behind by writers that died mid-commit.
+        for name in os.listdir(self.versions_dir) if os.path.isdir(self.versions_dir) else []:
+            tmp_path = os.path.join(self.versions_dir, name)
+            if not name.startswith(".tmp-"):
+                continue
+            # A live writer removes its own tmp file once the commit lands.
+            try:
+                if now - os.path.getmtime(tmp_path) > self.retention_seconds:
+                    os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+        return removed
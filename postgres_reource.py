@@ -1,20 +1,68 @@
 import os
-import pandas as pd
-import pyarrow.parquet as pq
 import sqlalchemy as sa
-from sqlalchemy.orm import Session
 from typing import Any, List, Dict
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy import Table, and_, or_
 from datetime import datetime
+from schema_catalog import default_catalog
+from index_advisor import IndexAdvisor
+from connection_pool import PoolMetrics, create_pooled_engine, timed_session
+from sql_filters import filter_clause
 
 
 class PostgresLoader:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, read_engine=None, read_metrics=None, write_metrics=None, catalog=None):
+        """
+        :param session: Session (or scoped_session) used for writes
+        :param read_engine: Optional read-only pooled engine used by `load_data`
+        """
         self.session = session
+        self.read_engine = read_engine
+        if read_engine is not None and read_metrics is None:
+            read_metrics = PoolMetrics().attach(read_engine)
+        self.read_metrics = read_metrics
+        self.write_metrics = write_metrics
+        self.ReadSession = sessionmaker(bind=read_engine) if read_engine is not None else None
+        self.catalog = catalog or default_catalog
+        write_engine = session.get_bind()
+        self.advisor = IndexAdvisor(
+            "postgresql",
+            read_engine=read_engine if read_engine is not None else write_engine,
+            write_engine=write_engine,
+        )
         self.logger = None  
 
+    @classmethod
+    def from_url(
+        cls,
+        db_url: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        prewarm: bool = True,
+    ) -> "PostgresLoader":
+        """
+        Build a loader that owns its pools: a thread-local write session and a
+        separate read-only pool for `load_data`.
+        """
+        pool_kwargs = dict(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout, prewarm=prewarm)
+        engine, write_metrics = create_pooled_engine(db_url, **pool_kwargs)
+        read_engine, read_metrics = create_pooled_engine(db_url, read_only=True, **pool_kwargs)
+        session = scoped_session(sessionmaker(bind=engine))
+        return cls(session, read_engine=read_engine, read_metrics=read_metrics, write_metrics=write_metrics)
+
+    def table(self, table_name: str) -> Table:
+        """Return the cached Table for `table_name`, reflecting only that table on first use."""
+        return self.catalog.table(self.read_engine if self.read_engine is not None else self.session.get_bind(), table_name)
+
+    def pool_status(self) -> Dict[str, Any]:
+        """Return read and write pool metrics, when the loader owns its pools."""
+        return {
+            "read": self.read_metrics.snapshot() if self.read_metrics else None,
+            "write": self.write_metrics.snapshot() if self.write_metrics else None,
+        }
+
     def load_data(
         self,
         model: Any,
@@ -35,9 +83,13 @@ class PostgresLoader:
         log_sample_values: bool = False,
         pretty_print: bool = True,
         logger=None,
+        partition: dict = None,
     ) -> List[Dict[str, Any]]:
         """
         Load data from a PostgreSQL database with filtering, sorting, and grouping.
+
+        `partition` restricts the scan to one disjoint slice of the table, see
+        `parallel_scan.parallel_load_data`.
         """
         query = sa.select(model)
 
@@ -60,11 +112,14 @@ class PostgresLoader:
         if filters:
             conditions = []
             for key, value in filters.items():
-                conditions.append(model.c[key] == value) 
+                conditions.append(filter_clause(model.c[key], value))
             if area_scope:
                 conditions.append(model.c.area == area_scope)
             query = query.where(*conditions)
 
+        if partition:
+            query = query.where(self._partition_clause(model, partition))
+
         if time_bucket is not None and isinstance(time_bucket, dict):
                 bucket_interval = time_bucket.get("bucket_interval")
                 bucket_timestamp = time_bucket.get("bucket_timestamp")
@@ -96,9 +151,39 @@ class PostgresLoader:
         if offset:
             query = query.offset(offset)
 
-        result_set = self.session.execute(query).mappings().all()
+        self.advisor.record(
+            model.name, query, filters=filters, order_by=order_by, order=order,
+            only_latest=only_latest, group_by=group_by,
+        )
+        if self.ReadSession is not None:
+            with timed_session(self.ReadSession, self.read_metrics) as session:
+                result_set = session.execute(query).mappings().all()
+        else:
+            result_set = self.session.execute(query).mappings().all()
         return [dict(row) for row in result_set]
 
+
+    @staticmethod
+    def _partition_clause(model, partition: dict):
+        column = model.c[partition["column"]]
+        if "modulus" in partition:
+            bucket = sa.func.hashtext(sa.cast(column, sa.Text)).op("&")(0x7FFFFFFF) % partition["modulus"]
+            return bucket == partition["remainder"]
+        conditions = []
+        if partition.get("lower") is not None:
+            conditions.append(column >= partition["lower"])
+        if partition.get("upper") is not None:
+            conditions.append(column < partition["upper"])
+        return sa.and_(sa.true(), *conditions)
+
+    def column_bounds(self, model: Any, column: str):
+        """Return (min, max) of `column`, used to plan range partitions."""
+        query = sa.select(sa.func.min(model.c[column]), sa.func.max(model.c[column]))
+        if self.ReadSession is not None:
+            with timed_session(self.ReadSession, self.read_metrics) as session:
+                return tuple(session.execute(query).one())
+        return tuple(self.session.execute(query).one())
+
     def upsert_data(self, model, data, id_fields, unique_fields, no_update_cols=None, return_counts=False):
         """
         Upserts data into PostgreSQL table with an additional check for unique fields.
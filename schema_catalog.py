@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class SchemaCatalog:
+    """
+    Reflects each table once and caches its column names, types and keys.
+
+    Entries are keyed by database (SQLAlchemy URL, DuckDB path or Parquet file)
+    and table name. A catalog can be saved as a JSON snapshot and loaded on
+    the next run; a snapshot entry is only trusted while its schema version
+    still matches the database (SQLite `PRAGMA schema_version`, Parquet file
+    mtime, or a version passed by the caller). DuckDB tables are described once
+    per process.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._tables: Dict[str, Any] = {}
+        self._validated = set()
+        self._lock = threading.Lock()
+        if snapshot_path and os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    @staticmethod
+    def _key(database: str, table_name: str) -> str:
+        return f"{database}::{table_name}"
+
+    def _cached(self, key: str, version: Any) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.get("schema_version") == version:
+            return entry
+        return None
+
+    def _store(self, key: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._entries[key] = entry
+            self._tables.pop(key, None)
+        return entry
+
+    # SQLAlchemy (SQLite / Postgres)
+
+    @staticmethod
+    def _schema_version(engine) -> Any:
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                return conn.exec_driver_sql("PRAGMA schema_version").scalar()
+        return None
+
+    def describe(self, engine, table_name: str, schema_version: Any = None) -> Dict[str, Any]:
+        """
+        Return {"columns": [[name, type], ...], "primary_key": [...], "unique": [[...], ...]}
+        for a SQLAlchemy table, reflecting it only on a cache miss.
+
+        :param schema_version: Version the cached entry must match; defaults to
+            SQLite's `PRAGMA schema_version`, other databases need it passed in
+            to detect changes
+        """
+        key = self._key(engine.url.render_as_string(hide_password=True), table_name)
+        if key in self._validated and schema_version is None:
+            # Already checked against the database in this process.
+            return self._entries[key]
+        if schema_version is None:
+            schema_version = self._schema_version(engine)
+        entry = self._cached(key, schema_version)
+        if entry is not None:
+            self._validated.add(key)
+            return entry
+
+        import sqlalchemy as sa
+
+        inspector = sa.inspect(engine)
+        if not inspector.has_table(table_name):
+            raise ValueError(f"Table '{table_name}' does not exist in the database")
+        columns = [[col["name"], str(col["type"])] for col in inspector.get_columns(table_name)]
+        primary_key = inspector.get_pk_constraint(table_name).get("constrained_columns") or []
+        unique = [idx["column_names"] for idx in inspector.get_indexes(table_name) if idx.get("unique")]
+        unique += [uc["column_names"] for uc in inspector.get_unique_constraints(table_name)]
+        entry = self._store(key, {
+            "schema_version": schema_version,
+            "columns": columns,
+            "primary_key": primary_key,
+            "unique": unique,
+        })
+        self._validated.add(key)
+        return entry
+
+    def table(self, engine, table_name: str, schema_version: Any = None):
+        """
+        Return a SQLAlchemy Table for `table_name`, built from the cached
+        description instead of reflecting the whole database.
+        """
+        entry = self.describe(engine, table_name, schema_version)
+        key = self._key(engine.url.render_as_string(hide_password=True), table_name)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        import sqlalchemy as sa
+
+        type_names = getattr(engine.dialect, "ischema_names", {})
+        columns = []
+        for name, type_name in entry["columns"]:
+            base = type_name.split("(")[0].strip()
+            type_cls = (
+                type_names.get(base) or type_names.get(base.lower())
+                or type_names.get(base.upper()) or sa.types.NullType
+            )
+            columns.append(sa.Column(name, type_cls(), primary_key=name in entry["primary_key"]))
+        table = sa.Table(table_name, sa.MetaData(), *columns)
+        with self._lock:
+            self._tables[key] = table
+        return table
+
+    # DuckDB
+
+    def duckdb_describe(self, conn, database: str, table_name: str) -> Dict[str, Any]:
+        """Return the cached description of a DuckDB table, running PRAGMA table_info on a miss."""
+        key = self._key(f"duckdb:{database}", table_name)
+        if key in self._validated:
+            return self._entries[key]
+        rows = conn.execute(f"PRAGMA table_info('{table_name}')").fetchall()
+        if not rows:
+            raise ValueError(f"Table '{table_name}' does not exist in the database")
+        entry = self._store(key, {
+            "schema_version": None,
+            "columns": [[row[1], row[2]] for row in rows],
+            "primary_key": [row[1] for row in rows if row[5]],
+            "unique": [],
+        })
+        self._validated.add(key)
+        return entry
+
+    # Parquet
+
+    def parquet_describe(self, path: str) -> Dict[str, Any]:
+        """Return the cached schema of a Parquet file; the file's mtime is its schema version."""
+        version = os.path.getmtime(path)
+        key = self._key(f"parquet:{os.path.abspath(path)}", "")
+        entry = self._cached(key, version)
+        if entry is not None:
+            return entry
+
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+        return self._store(key, {
+            "schema_version": version,
+            "columns": [[field.name, str(field.type)] for field in schema],
+            "primary_key": [],
+            "unique": [],
+        })
+
+    def columns(self, entry: Dict[str, Any]) -> List[str]:
+        return [name for name, _ in entry["columns"]]
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Drop cached entries for `table_name`, or everything."""
+        with self._lock:
+            for key in list(self._entries):
+                if table_name is None or key.endswith(f"::{table_name}"):
+                    self._entries.pop(key, None)
+                    self._tables.pop(key, None)
+                    self._validated.discard(key)
+
+    def save(self, path: Optional[str] = None):
+        """Write the catalog as a JSON snapshot."""
+        path = path or self.snapshot_path
+        if not path:
+            raise ValueError("No snapshot path given")
+        with self._lock:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, indent=2, default=str)
+            os.replace(tmp_path, path)
+
+
+default_catalog = SchemaCatalog()
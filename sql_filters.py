@@ -0,0 +1,66 @@
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# `load_data` filters: {"col": value}, {"col": [v1, v2]} or {"col": {">=": v, "<": w}}.
+OPERATORS = {"==": "=", "!=": "!=", ">": ">", ">=": ">=", "<": "<", "<=": "<="}
+
+
+def filter_clause(column, value):
+    """Build the SQLAlchemy condition for one `load_data` filter on `column`."""
+    import sqlalchemy as sa
+
+    if isinstance(value, list):
+        return column.in_(value)
+    if isinstance(value, dict):
+        operators = {
+            "==": column.__eq__,
+            "!=": column.__ne__,
+            ">": column.__gt__,
+            ">=": column.__ge__,
+            "<": column.__lt__,
+            "<=": column.__le__,
+        }
+        for op in value:
+            if op not in operators:
+                raise ValueError(f"Unsupported operator: {op}")
+        return sa.and_(*[operators[op](val) for op, val in value.items()])
+    return column == value
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def filter_conditions(
+    filters: Dict[str, Any],
+    columns: Sequence[str] = None,
+    convert: Callable[[Any], Any] = None,
+) -> Tuple[List[str], List[Any]]:
+    """
+    Translate `load_data` filters into SQL conditions with `?` placeholders.
+
+    :param columns: Known column names; unknown filter columns raise ValueError
+    :param convert: Applied to each bound value
+    :return: Tuple of (conditions, parameters)
+    """
+    convert = convert or (lambda value: value)
+    conditions, params = [], []
+    for column, value in (filters or {}).items():
+        if columns is not None and column not in columns:
+            raise ValueError(f"Column '{column}' not found in DataFrame")
+        name = quote_identifier(column)
+        if isinstance(value, list):
+            if not value:
+                conditions.append("FALSE")
+                continue
+            conditions.append(f"{name} IN ({', '.join('?' for _ in value)})")
+            params.extend(convert(val) for val in value)
+        elif isinstance(value, dict):
+            for op, val in value.items():
+                if op not in OPERATORS:
+                    raise ValueError(f"Unsupported operator: {op}")
+                conditions.append(f"{name} {OPERATORS[op]} ?")
+                params.append(convert(val))
+        else:
+            conditions.append(f"{name} = ?")
+            params.append(convert(value))
+    return conditions, params
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_ship_frame(rows: int = 500, vessels: int = 50, hours: int = 10, seed: int = 0) -> pd.DataFrame:
+    """Synthetic ship_data rows with the columns of data.parquet."""
+    rng = np.random.default_rng(seed)
+    mmsi = 100000000 + rng.integers(0, vessels, rows)
+    timestamps = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, hours * 3600, rows), unit="s")
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "trackname": [f"Vessel {m % 7}" for m in mmsi],
+        "latitude": rng.uniform(-60, 60, rows),
+        "longitude": rng.uniform(-180, 180, rows),
+        "course": rng.uniform(0, 360, rows),
+        "speed": rng.uniform(0, 25, rows),
+        "height_depth": rng.uniform(0, 20, rows),
+        "mmsi_no": mmsi,
+        "imo": 9000000 + mmsi % 100000,
+        "cargo_type": np.array(["Bulk", "Container", "General", "Tanker"])[mmsi % 4],
+        "length": 100 + mmsi % 200,
+        "width": 10 + mmsi % 40,
+        "name": [f"Ship {m}" for m in mmsi],
+        "timestamp_updated": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+
+@pytest.fixture
+def ship_frame():
+    return make_ship_frame
+
+
+@pytest.fixture
+def parquet_table(tmp_path):
+    """Write a synthetic table to Parquet and return its path."""
+    def write(df=None, row_group_size=None, name="ships.parquet"):
+        path = str(tmp_path / name)
+        (df if df is not None else make_ship_frame()).to_parquet(path, index=False, row_group_size=row_group_size)
+        return path
+    return write
@@ -0,0 +1,107 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from approximate_query import SketchStore
+from parquet_resoures import ParquetLoader
+
+
+def test_distinct_and_quantiles_within_bounds(ship_frame):
+    df = ship_frame(rows=20000, vessels=3000, hours=4)
+    store = SketchStore(seed=0)
+    store.rebuild(df)
+
+    (overall,) = store.distinct()
+    exact = df["mmsi_no"].nunique()
+    assert overall["lower"] <= exact <= overall["upper"]
+    assert overall["rows"] == len(df)
+
+    for row in store.quantiles(qs=[0.5, 0.9]):
+        exact_rank = (df["speed"] <= row["value"]).mean()
+        assert abs(exact_rank - row["quantile"]) <= row["rank_error"]
+
+
+def test_save_round_trip_without_pickle(tmp_path, ship_frame):
+    df = ship_frame(rows=3000, vessels=200, hours=6)
+    path = str(tmp_path / "ships.parquet.sketches.npz")
+    store = SketchStore(path, sample_size=500, seed=1)
+    store.rebuild(df, version=7)
+    store.save()
+
+    with np.load(path, allow_pickle=False) as archive:
+        assert archive["hll"].dtype == np.uint8
+
+    loaded = SketchStore.open(path, sample_size=500)
+    assert loaded.version == 7
+    assert loaded.rows_seen == len(df)
+    assert set(loaded.partitions) == set(store.partitions)
+    assert loaded.distinct(group_by=["time_bucket", "cargo_type"]) == store.distinct(group_by=["time_bucket", "cargo_type"])
+    for key, part in store.partitions.items():
+        restored = loaded.partitions[key]["kll"]["speed"]
+        assert restored.n == part["kll"]["speed"].n
+        for items, expected in zip(restored.levels, part["kll"]["speed"].levels):
+            np.testing.assert_array_equal(items, expected)
+    pd.testing.assert_frame_equal(loaded.sample, store.sample, check_dtype=False)
+
+    # Settings that no longer match give an empty store to be rebuilt.
+    assert SketchStore.open(path, sample_size=100).version is None
+
+
+def test_pickled_file_is_not_loaded(tmp_path):
+    path = str(tmp_path / "ships.parquet.sketches.npz")
+    with open(path, "wb") as f:
+        pickle.dump({"version": 3}, f)
+    store = SketchStore.open(path)
+    assert store.version is None
+    assert not store.partitions
+
+
+def test_replaced_rows_are_reported_stale(tmp_path, ship_frame):
+    df = ship_frame(rows=200, vessels=20, hours=2)
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path, sketches=True)
+    loader.upsert_data(path, df.to_dict("records"), ["id"], [], [], False)
+    result = loader.approximate("distinct", refresh=False)
+    assert result["success"] and not result["stale"]
+    assert result["replaced_rows"] == 0
+    assert os.path.exists(path + ".sketches.npz")
+
+    # Move one vessel's row to another cargo type: its old partition still counts it.
+    moved = df.iloc[[0]].assign(cargo_type="Moved")
+    loader.upsert_data(path, moved.to_dict("records"), ["id"], [], [], False)
+    result = loader.approximate("distinct", refresh=False, group_by=["cargo_type"])
+    assert result["stale"]
+    assert result["replaced_rows"] == 1
+    assert sum(row["rows"] for row in result["results"]) == len(df) + 1
+
+
+def test_refresh_rebuilds_once_drift_passes_threshold(tmp_path, ship_frame):
+    df = ship_frame(rows=200, vessels=20, hours=2)
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path, sketches=True)
+    loader.upsert_data(path, df.to_dict("records"), ["id"], [], [], False)
+
+    moved = df.iloc[:5].assign(cargo_type="Moved")
+    loader.upsert_data(path, moved.to_dict("records"), ["id"], [], [], False)
+    result = loader.approximate("distinct", max_drift=0.05)
+    assert result["replaced_rows"] == 5 and result["stale"]
+
+    moved = df.iloc[5:20].assign(cargo_type="Moved")
+    loader.upsert_data(path, moved.to_dict("records"), ["id"], [], [], False)
+    result = loader.approximate("distinct", group_by=["cargo_type"], max_drift=0.05)
+    assert result["replaced_rows"] == 0 and not result["stale"]
+    assert sum(row["rows"] for row in result["results"]) == len(df)
+    assert {row["cargo_type"]: row["rows"] for row in result["results"]}["Moved"] == 20
+
+
+def test_store_without_sample(ship_frame):
+    df = ship_frame(rows=300)
+    store = SketchStore(sample_size=0)
+    store.rebuild(df)
+    store.add(df.iloc[:10], replaced_rows=10)
+    assert store.rows_seen == 310
+    assert store.sample is None
+    assert store.sample_estimate()["sample_rows"] == 0
+    assert store.distinct()[0]["rows"] == 310
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pyarrow.parquet as pq
+import sqlalchemy as sa
+
+import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _imported_after(code):
+    """Run `code` in a fresh interpreter and return the heavy modules it imported."""
+    script = (
+        f"import sys; sys.path.insert(0, {ROOT!r}); import cli; {code}; "
+        "print(sorted(m for m in ('pandas', 'pyarrow', 'sqlalchemy', 'duckdb') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1].replace("'", '"'))
+
+
+def _json_lines(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_imports_stay_lazy(parquet_table, tmp_path):
+    assert _imported_after("cli.build_parser()") == []
+
+    csv_path = str(tmp_path / "ships.csv")
+    pd.read_parquet(parquet_table()).to_csv(csv_path, index=False)
+    convert = f"cli.main(['convert', '--input', {csv_path!r}, '--output', {str(tmp_path / 'out.parquet')!r}])"
+    assert "sqlalchemy" not in _imported_after(convert)
+    assert "duckdb" not in _imported_after(convert)
+
+    db = f"sqlite:///{tmp_path / 'ships.sqlite'}"
+    pd.read_parquet(parquet_table()).to_sql("ship_data", sa.create_engine(db), index=False)
+    load = f"cli.main(['load', '--backend', 'sqlite', '--db', {db!r}, '--limit', '1'])"
+    assert "duckdb" not in _imported_after(load)
+
+
+def test_load_parquet_prints_only_json_lines(parquet_table, capsys):
+    path = parquet_table()
+    assert cli.main(["load", "--backend", "parquet", "--db", path, "--filter", "speed>=20", "--limit", "5"]) == 0
+    out = capsys.readouterr().out
+    rows = _json_lines(out)
+    assert len(rows) == 5
+    assert all(row["speed"] >= 20 for row in rows)
+
+    # Loader errors go to stderr as well.
+    assert cli.main(["load", "--backend", "parquet", "--db", path + ".missing"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "does not exist" in captured.err
+
+
+def test_load_sqlite_with_only_latest(parquet_table, tmp_path, capsys):
+    df = pd.read_parquet(parquet_table())
+    db = f"sqlite:///{tmp_path / 'ships.sqlite'}"
+    df.to_sql("ship_data", sa.create_engine(db), index=False)
+
+    assert cli.main(["load", "--backend", "sqlite", "--db", db, "--only-latest", "mmsi_no", "--columns", "mmsi_no,timestamp_updated"]) == 0
+    rows = _json_lines(capsys.readouterr().out)
+    latest = df.groupby("mmsi_no")["timestamp_updated"].max()
+    assert len(rows) == len(latest)
+    assert all(latest[row["mmsi_no"]] == row["timestamp_updated"] for row in rows)
+
+
+def test_convert_round_trip(parquet_table, tmp_path, capsys):
+    df = pd.read_parquet(parquet_table())
+    csv_path, out_path = str(tmp_path / "ships.csv"), str(tmp_path / "out.parquet")
+    df.to_csv(csv_path, index=False)
+
+    assert cli.main(["convert", "--input", csv_path, "--output", out_path]) == 0
+    assert capsys.readouterr().out == f"Converted {len(df)} rows: {csv_path} -> {out_path}\n"
+    converted = pq.read_table(out_path).to_pandas()
+    assert converted["timestamp_updated"].tolist() == df["timestamp_updated"].tolist()
+    pd.testing.assert_frame_equal(converted, df, check_dtype=False)
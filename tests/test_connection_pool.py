@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Duckdb_resourcers import DuckDBLoader
+
+
+def test_duckdb_cursors_of_finished_threads_are_released(ship_frame):
+    loader = DuckDBLoader()
+    frame = ship_frame(100)
+    loader.conn.execute("CREATE TABLE ship_data AS SELECT * FROM frame")
+
+    for _ in range(5):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: loader.load_data("ship_data", limit=5), range(8)))
+
+    status = loader.pool_status()
+    assert status["in_use"] == 0
+    assert status["checkins"] == status["connects"]
+    assert status["peak_in_use"] <= 5
+
+
+def test_duckdb_cursor_is_reused_within_a_thread():
+    loader = DuckDBLoader()
+    assert loader.cursor() is loader.cursor()
+    cursors = []
+    thread = threading.Thread(target=lambda: cursors.append(loader.cursor()))
+    thread.start()
+    thread.join()
+    assert cursors[0] is not loader.cursor()
+    assert loader.pool_status()["in_use"] == 1
+
+
+def test_timed_session_counts_only_contended_checkouts(tmp_path, ship_frame):
+    from Sqlite_resource import SQLiteLoader
+    import sqlite3
+
+    path = tmp_path / "ships.sqlite"
+    with sqlite3.connect(path) as conn:
+        ship_frame(50).to_sql("ship_data", conn, index=False)
+    loader = SQLiteLoader(f"sqlite:///{path}", pool_size=2, max_overflow=0)
+    model = loader.table("ship_data")
+
+    for _ in range(10):
+        loader.load_data(model, None, limit=5)
+    assert loader.pool_status()["read"]["waits"] == 0
+
+
+def test_timed_session_without_metrics(tmp_path, ship_frame):
+    import sqlite3
+    import sqlalchemy as sa
+    from sqlalchemy.orm import sessionmaker
+    from connection_pool import timed_session
+    from postgres_reource import PostgresLoader
+
+    path = tmp_path / "ships.sqlite"
+    with sqlite3.connect(path) as conn:
+        ship_frame(50).to_sql("ship_data", conn, index=False)
+    engine = sa.create_engine(f"sqlite:///{path}")
+
+    with timed_session(sessionmaker(bind=engine), None) as session:
+        assert session.execute(sa.text("SELECT COUNT(*) FROM ship_data")).scalar() == 50
+
+    # A read engine passed without metrics gets its own.
+    loader = PostgresLoader(sessionmaker(bind=engine)(), read_engine=engine)
+    rows = loader.load_data(loader.table("ship_data"), None, None, None, None, limit=5)
+    assert len(rows) == 5
+    assert loader.pool_status()["read"]["checkouts"] >= 1
+    assert loader.column_bounds(loader.table("ship_data"), "id") == (1, 50)
@@ -0,0 +1,73 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pandas as pd
+import pytest
+
+from cross_source_query import CrossSourceQuery
+from Sqlite_resource import SQLiteLoader
+
+JOIN = """
+    SELECT p.mmsi_no, COUNT(*) AS positions, ANY_VALUE(r.flag) AS flag
+    FROM positions p JOIN registry r USING (mmsi_no)
+    GROUP BY p.mmsi_no ORDER BY p.mmsi_no
+"""
+
+
+@pytest.fixture
+def registry_db(tmp_path):
+    path = tmp_path / "registry.sqlite"
+    registry = pd.DataFrame({"mmsi_no": [100000000 + i for i in range(0, 10, 2)], "flag": list("ABCDE")})
+    with sqlite3.connect(path) as conn:
+        registry.to_sql("registry", conn, index=False)
+    return str(path), registry
+
+
+def _expected(positions, registry):
+    merged = positions.merge(registry, on="mmsi_no")
+    return merged.groupby("mmsi_no").agg(positions=("id", "size"), flag=("flag", "first")).reset_index()
+
+
+def test_join_loader_frame_with_parquet(parquet_table, ship_frame, registry_db):
+    positions = ship_frame(500, vessels=10)
+    path, registry = registry_db
+    loader = SQLiteLoader(f"sqlite:///{path}", pool_size=1, max_overflow=0, prewarm=False)
+
+    query = CrossSourceQuery()
+    query.register_parquet("positions", parquet_table(positions))
+    query.register_loader("registry", loader, loader.table("registry"))
+    result = pd.DataFrame(query.query(JOIN))
+
+    pd.testing.assert_frame_equal(result, _expected(positions, registry), check_dtype=False)
+    assert query.sources == {"positions": "parquet", "registry": "loader"}
+
+
+def test_attach_sqlite(parquet_table, ship_frame, registry_db):
+    positions = ship_frame(500, vessels=10)
+    path, registry = registry_db
+    query = CrossSourceQuery()
+    query.register_parquet("positions", parquet_table(positions))
+    try:
+        query.register_sqlite("reg", path)
+    except duckdb.Error as e:
+        pytest.skip(f"DuckDB sqlite extension unavailable: {e}")
+
+    result = pd.DataFrame(query.query(JOIN.replace("JOIN registry r", "JOIN reg.registry r")))
+    pd.testing.assert_frame_equal(result, _expected(positions, registry), check_dtype=False)
+
+
+def test_queries_use_pooled_cursors(parquet_table):
+    query = CrossSourceQuery()
+    query.register_parquet("positions", parquet_table())
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        counts = list(pool.map(lambda _: query.query("SELECT COUNT(*) AS n FROM positions")[0]["n"], range(8)))
+    assert counts == [500] * 8
+    assert query.cursor() is query.cursor()
+
+    status = query.pool_status()
+    assert status["in_use"] == 1
+    assert status["checkins"] == status["connects"] - 1
+    with pytest.raises(ValueError):
+        query.register_parquet("bad name", "x.parquet")
@@ -0,0 +1,111 @@
+import json
+
+import pandas as pd
+import pytest
+
+from Duckdb_resourcers import DuckDBLoader
+from incremental_sync import IncrementalSync, WatermarkStore
+from parquet_resoures import ParquetLoader
+
+
+def _source(timestamps):
+    frame = pd.DataFrame({
+        "id": range(1, len(timestamps) + 1),
+        "mmsi_no": [100000000 + i for i in range(len(timestamps))],
+        "speed": 1.0,
+        "timestamp_updated": timestamps,
+    })
+    loader = DuckDBLoader()
+    loader.conn.execute("CREATE TABLE ship_data AS SELECT * FROM frame")
+    return loader
+
+
+def _sync(source, target_path, tmp_path, target=None, batch_size=10):
+    return IncrementalSync(
+        source, "ship_data", target or ParquetLoader(target_path), target_path, ["id"],
+        WatermarkStore(str(tmp_path / "marks.json")), "ships", batch_size=batch_size,
+    )
+
+
+class CrashingTarget:
+    """Writes through to a ParquetLoader, then fails on the `crash_on`-th batch."""
+
+    def __init__(self, path, crash_on, after_write):
+        self.loader = ParquetLoader(path)
+        self.crash_on = crash_on
+        self.after_write = after_write
+        self.calls = 0
+
+    def upsert_data(self, *args):
+        self.calls += 1
+        if self.calls == self.crash_on and not self.after_write:
+            return {"success": False, "message": "connection lost"}
+        result = self.loader.upsert_data(*args)
+        if self.calls == self.crash_on:
+            raise KeyboardInterrupt
+        return result
+
+
+def test_watermark_reset_is_atomic(tmp_path):
+    store = WatermarkStore(str(tmp_path / "marks.json"))
+    store.set("a", "2024-01-01 00:00:00", [[1]])
+    store.set("b", "2024-01-02 00:00:00", [[2]])
+    store.reset("a")
+    assert list(json.loads((tmp_path / "marks.json").read_text())) == ["b"]
+    assert not (tmp_path / "marks.json.tmp").exists()
+
+
+@pytest.mark.parametrize("after_write", [False, True], ids=["before_write", "after_write"])
+def test_resume_after_crash(tmp_path, after_write):
+    timestamps = [f"2024-01-01 00:{minute:02d}:00" for minute in range(35)]
+    source = _source(timestamps)
+    path = str(tmp_path / "target.parquet")
+
+    crashing = _sync(source, path, tmp_path, target=CrashingTarget(path, crash_on=2, after_write=after_write))
+    if after_write:
+        with pytest.raises(KeyboardInterrupt):
+            crashing.run()
+    else:
+        assert not crashing.run()["success"]
+    # Only the first batch is acknowledged.
+    assert crashing.watermarks.get("ships")["timestamp"] == timestamps[9]
+
+    result = _sync(source, path, tmp_path).run()
+    assert result["success"]
+    assert result["rows_copied"] == 25
+    assert result["lag_seconds"] == 0
+    target = pd.read_parquet(path)
+    assert sorted(target["id"]) == list(range(1, 36))
+
+
+def test_rows_sharing_a_timestamp_span_batches(tmp_path):
+    timestamps = ["2024-01-01 00:00:00"] * 3 + ["2024-01-01 01:00:00"] * 25 + ["2024-01-01 02:00:00"] * 2
+    source = _source(timestamps)
+    path = str(tmp_path / "target.parquet")
+
+    result = _sync(source, path, tmp_path, batch_size=10).run()
+    assert result["rows_copied"] == 30
+    assert result["batches"] == 3
+    assert sorted(pd.read_parquet(path)["id"]) == list(range(1, 31))
+
+    mark = WatermarkStore(str(tmp_path / "marks.json")).get("ships")
+    assert mark["timestamp"] == "2024-01-01 02:00:00"
+    assert sorted(mark["keys"]) == [[29], [30]]
+
+
+def test_over_fetch_skips_copied_ties_and_still_makes_progress(tmp_path):
+    timestamps = ["2024-01-01 00:00:00"] * 20
+    source = _source(timestamps)
+    path = str(tmp_path / "target.parquet")
+    sync = _sync(source, path, tmp_path, batch_size=5)
+    sync.watermarks.set("ships", timestamps[0], [[i] for i in range(1, 11)])
+
+    limits = []
+    load = sync._load
+    sync._load = lambda **kwargs: limits.append(kwargs.get("limit")) or load(**kwargs)
+
+    batch = sync.next_batch()
+    assert limits == [15]
+    # Ties come back in any order; copied keys are skipped and the batch stays full.
+    assert len(batch) == 5
+    assert all(row["id"] > 10 for row in batch)
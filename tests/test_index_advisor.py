@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from Duckdb_resourcers import DuckDBLoader
+from Sqlite_resource import SQLiteLoader
+
+LATEST = {"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"}
+
+
+@pytest.fixture
+def sqlite_loader(tmp_path, ship_frame):
+    path = tmp_path / "ships.sqlite"
+    with sqlite3.connect(path) as conn:
+        ship_frame(500).to_sql("ship_data", conn, index=False)
+    return SQLiteLoader(f"sqlite:///{path}", pool_size=1, max_overflow=0, prewarm=False)
+
+
+@pytest.fixture
+def duckdb_loader(ship_frame):
+    loader = DuckDBLoader()
+    frame = ship_frame(500)
+    loader.conn.execute("CREATE TABLE ship_data AS SELECT * FROM frame")
+    return loader
+
+
+def _run_workload(loader, model):
+    for _ in range(3):
+        loader.load_data(model, only_latest=LATEST)
+    loader.load_data(model, filters={"mmsi_no": 100000001}, order_by="timestamp_updated", order="desc")
+
+
+def _index_names(advisor):
+    return sorted(index["name"] for index in advisor.existing_indexes("ship_data"))
+
+
+def test_sqlite_recommends_latest_per_vessel_index(sqlite_loader):
+    _run_workload(sqlite_loader, sqlite_loader.table("ship_data"))
+    advisor = sqlite_loader.advisor
+
+    (recommendation,) = advisor.recommend()
+    assert recommendation["table"] == "ship_data"
+    assert recommendation["columns"] == ["mmsi_no ASC", "timestamp_updated DESC"]
+    assert recommendation["count"] == 4
+    assert recommendation["ddl"] == (
+        "CREATE INDEX IF NOT EXISTS ix_ship_data_mmsi_no_timestamp_updated "
+        "ON ship_data (mmsi_no, timestamp_updated DESC)"
+    )
+    assert any(entry["full_scan"] for entry in advisor.explain_report())
+
+    (created,) = advisor.create_recommended()
+    assert created["created"]
+    indexes = _index_names(advisor)
+    assert advisor.recommend() == []
+    assert advisor.create_recommended() == []
+    assert _index_names(advisor) == indexes
+
+    # Rerunning the DDL itself is harmless as well.
+    advisor._execute(recommendation["ddl"], write=True)
+    assert _index_names(advisor) == indexes
+
+
+def test_duckdb_recommends_latest_per_vessel_index(duckdb_loader):
+    _run_workload(duckdb_loader, "ship_data")
+    advisor = duckdb_loader.advisor
+
+    (recommendation,) = advisor.recommend()
+    assert recommendation["columns"] == ["mmsi_no ASC", "timestamp_updated DESC"]
+    # ART indexes have no sort direction.
+    assert recommendation["ddl"].endswith("ON ship_data (mmsi_no, timestamp_updated)")
+
+    assert advisor.create_recommended()[0]["created"]
+    indexes = _index_names(advisor)
+    assert advisor.recommend() == []
+    assert advisor.create_recommended() == []
+    assert _index_names(advisor) == indexes
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+def test_verify_conflict_target(backend, sqlite_loader, duckdb_loader):
+    advisor = (sqlite_loader if backend == "sqlite" else duckdb_loader).advisor
+
+    missing = advisor.verify_conflict_target("ship_data", ["id"])
+    assert not missing["success"]
+    assert missing["ddl"] == "CREATE UNIQUE INDEX IF NOT EXISTS ux_ship_data_id ON ship_data (id)"
+
+    created = advisor.verify_conflict_target("ship_data", ["id"], create=True)
+    assert created["success"] and created["created"]
+    found = advisor.verify_conflict_target("ship_data", ["id"])
+    assert found["success"] and "ddl" not in found
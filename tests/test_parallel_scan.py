@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from parallel_scan import parallel_load_data
+from parquet_resoures import ParquetLoader
+
+
+LOAD_OPTIONS = [
+    {},
+    {"filters": {"speed": {">": 5}}},
+    {"order_by": "speed", "order": "desc", "limit": 7},
+    {"distinct": True},
+    {"only_latest": {"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"}},
+    {"group_by": ["mmsi_no"]},
+    {"time_bucket": {"bucket_interval": "1h", "bucket_timestamp": "timestamp_updated", "distinct_column": "mmsi_no"}},
+]
+
+
+def _normalized(rows):
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("options", LOAD_OPTIONS, ids=lambda options: ",".join(options) or "scan")
+@pytest.mark.parametrize("strategy", ["range", "hash", "row_group"])
+def test_parallel_matches_single_scan(parquet_table, ship_frame, options, strategy):
+    path = parquet_table(ship_frame(5000, vessels=50, hours=10), row_group_size=500)
+    loader = ParquetLoader(path)
+    column = "mmsi_no" if strategy == "hash" else "id"
+
+    expected = loader.load_data("ships", None, **options)
+    actual = parallel_load_data(
+        loader, "ships", strategy=strategy, column=column, parts=4, max_workers=4,
+        selected_columns_or_path=None, **options,
+    )
+
+    assert len(actual) == len(expected)
+    if "order_by" in options:
+        assert [row["speed"] for row in actual] == [row["speed"] for row in expected]
+    elif "group_by" in options:
+        # Same groups, same first row per group, same order.
+        pd.testing.assert_frame_equal(pd.DataFrame(actual), pd.DataFrame(expected), check_like=True)
+    else:
+        pd.testing.assert_frame_equal(_normalized(actual), _normalized(expected), check_like=True)
+
+
+def test_time_bucket_counts_each_bucket(parquet_table, ship_frame):
+    path = parquet_table(ship_frame(5000, vessels=50, hours=10), row_group_size=500)
+    options = {"bucket_interval": "1h", "bucket_timestamp": "timestamp_updated", "distinct_column": "mmsi_no"}
+    rows = parallel_load_data(ParquetLoader(path), "ships", strategy="row_group", parts=4, selected_columns_or_path=None, time_bucket=options)
+    assert len(rows) == 500
+    assert list(rows[0]) == ["mmsi_no"]
+
+
+def test_group_first_row_in_later_row_group(parquet_table):
+    # Row groups [mmsi 1, 2], [7, 3], [7, 4]: mmsi 7 first appears in the second one.
+    df = pd.DataFrame({"id": [1, 2, 3, 4, 5, 6], "mmsi_no": [1, 2, 7, 3, 7, 4], "speed": [1.0] * 6})
+    loader = ParquetLoader(parquet_table(df, row_group_size=2))
+
+    expected = loader.load_data("ships", None, group_by=["mmsi_no"])
+    actual = parallel_load_data(loader, "ships", strategy="row_group", parts=2, selected_columns_or_path=None, group_by=["mmsi_no"])
+
+    assert [row["mmsi_no"] for row in actual] == [1, 2, 3, 4, 7]
+    assert [row["id"] for row in actual] == [row["id"] for row in expected]
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_order_by_puts_nulls_last(parquet_table, order):
+    df = pd.DataFrame({"id": [1, 2, 3, 4], "mmsi_no": [1, 2, 3, 4], "speed": [2.0, None, 1.0, 3.0]})
+    loader = ParquetLoader(parquet_table(df, row_group_size=1))
+
+    expected = loader.load_data("ships", None, order_by="speed", order=order)
+    actual = parallel_load_data(loader, "ships", strategy="row_group", parts=4, selected_columns_or_path=None, order_by="speed", order=order)
+
+    assert [row["id"] for row in actual] == [row["id"] for row in expected]
+    assert actual[-1]["id"] == 2
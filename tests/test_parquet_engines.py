@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from parquet_resoures import ParquetLoader
+
+
+ENGINE_OPTIONS = [
+    {"filters": {"speed": {">": 5}, "cargo_type": ["Bulk", "Tanker"]}},
+    {"only_latest": {"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"}},
+    {"only_latest": {"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"}, "order_by": "speed", "limit": 5},
+    {"distinct": True},
+    {"group_by": ["mmsi_no"]},
+]
+
+
+def _frame(rows, sort_by):
+    return pd.DataFrame(rows).sort_values(sort_by).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("engine", ["duckdb", "out_of_core"])
+@pytest.mark.parametrize("options", ENGINE_OPTIONS, ids=lambda options: ",".join(options))
+def test_engines_match_pandas(parquet_table, ship_frame, engine, options):
+    path = parquet_table(ship_frame(2000), row_group_size=200)
+    expected = ParquetLoader(path).load_data("ships", None, **options)
+    actual = ParquetLoader(path, engine=engine).load_data("ships", None, **options)
+
+    assert list(pd.DataFrame(actual).columns) == list(pd.DataFrame(expected).columns)
+    pd.testing.assert_frame_equal(_frame(actual, "id"), _frame(expected, "id"), check_dtype=False)
+    if "only_latest" in options:
+        assert pd.api.types.is_datetime64_any_dtype(pd.DataFrame(actual)["timestamp_updated"])
@@ -0,0 +1,75 @@
+import pyarrow.parquet as pq
+import pytest
+
+from parquet_layout import cluster_order, optimize_parquet, pruning_report
+
+
+@pytest.fixture
+def layout_table(parquet_table, ship_frame):
+    df = ship_frame(20000, vessels=200, hours=24, seed=3)
+    workload = [
+        {"mmsi_no": int(df["mmsi_no"].iloc[0])},
+        {
+            "latitude": {">=": 10, "<": 20},
+            "longitude": {">=": 30, "<": 60},
+            "timestamp_updated": {">=": "2024-01-01 06:00:00", "<": "2024-01-01 09:00:00"},
+        },
+    ]
+    return parquet_table(df, row_group_size=1000), df, workload
+
+
+@pytest.mark.parametrize("method, mmsi_skip, bbox_skip", [
+    ("linear", 0.9, 0.0),
+    ("zorder", 0.0, 0.5),
+    ("hilbert", 0.0, 0.75),
+])
+def test_layout_skips_row_groups(layout_table, tmp_path, method, mmsi_skip, bbox_skip):
+    path, df, workload = layout_table
+    output = str(tmp_path / f"{method}.parquet")
+    result = optimize_parquet(path, output=output, method=method, row_group_size=1000, workload=workload)
+
+    assert result["success"] and result["rows"] == len(df)
+    assert [q["row_groups_skipped"] for q in result["before"]["queries"]] == [0.0, 0.0]
+    mmsi, bbox = result["after"]["queries"]
+    assert mmsi["row_groups_skipped"] >= mmsi_skip
+    assert bbox["row_groups_skipped"] >= bbox_skip
+    assert result["after"] == pruning_report(output, workload)
+
+    # Same rows, only reordered.
+    optimized = pq.read_table(output).to_pandas().sort_values("id").reset_index(drop=True)
+    assert optimized.equals(df.sort_values("id").reset_index(drop=True))
+
+
+def test_hilbert_prunes_boxes_better_than_zorder(layout_table, tmp_path):
+    path, _, workload = layout_table
+    skipped = {}
+    for method in ("zorder", "hilbert"):
+        output = str(tmp_path / f"{method}.parquet")
+        result = optimize_parquet(path, output=output, method=method, row_group_size=1000, workload=workload[1:])
+        skipped[method] = result["after"]["avg_row_groups_skipped"]
+    assert skipped["hilbert"] >= skipped["zorder"]
+
+
+def test_metadata_records_bloom_filters_and_sort_order(layout_table, tmp_path):
+    path, _, _ = layout_table
+    output = str(tmp_path / "linear.parquet")
+    result = optimize_parquet(path, output=output, method="linear", row_group_size=1000)
+    assert result["bloom_filter_columns"] == ["mmsi_no"]
+
+    metadata = pq.ParquetFile(output).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    for rg in range(metadata.num_row_groups):
+        row_group = metadata.row_group(rg)
+        assert row_group.column(names.index("mmsi_no")).bloom_filter_offset > 0
+        assert [names[col.column_index] for col in row_group.sorting_columns] == ["mmsi_no", "timestamp_updated"]
+
+    # Space-filling layouts are not sorted on any one column, so they declare no sort order.
+    output = str(tmp_path / "hilbert.parquet")
+    optimize_parquet(path, output=output, method="hilbert", row_group_size=1000)
+    assert not pq.ParquetFile(output).metadata.row_group(0).sorting_columns
+
+
+def test_cluster_order_rejects_unknown_method(layout_table):
+    path, _, _ = layout_table
+    with pytest.raises(ValueError):
+        cluster_order(pq.read_table(path), ["latitude"], method="spiral")
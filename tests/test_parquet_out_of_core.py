@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from parquet_out_of_core import SpillingReducer, load_out_of_core
+from parquet_resoures import ParquetLoader
+
+
+QUERIES = [
+    {"only_latest": {"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"}},
+    {"distinct": True},
+    {"group_by": ["mmsi_no"]},
+    {"time_bucket": {"bucket_interval": "1h", "bucket_timestamp": "timestamp_updated", "distinct_column": "mmsi_no"}},
+    {"only_latest": {"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"}, "group_by": ["cargo_type"]},
+]
+
+
+@pytest.mark.parametrize("options", QUERIES, ids=lambda options: ",".join(options))
+def test_forced_spill_matches_pandas_engine(parquet_table, ship_frame, options):
+    frame = pd.concat([ship_frame(1000, vessels=300, seed=seed) for seed in range(5)], ignore_index=True)
+    frame["id"] = np.arange(1, len(frame) + 1)
+    path = parquet_table(frame, row_group_size=250)
+
+    expected = pd.DataFrame(ParquetLoader(path).load_data("ships", None, **options))
+    result = load_out_of_core(path, ParquetLoader._apply_filters, memory_budget=20_000, **options)
+    actual = result["frame"]
+
+    assert result["spilled"]
+    assert list(actual.columns) == list(expected.columns)
+    key = list(expected.columns)
+    pd.testing.assert_frame_equal(
+        actual.sort_values(key).reset_index(drop=True), expected.sort_values(key).reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_spill_partitions_are_reduced_in_bounded_memory(tmp_path, monkeypatch):
+    keys, row_groups = 2000, 100
+    schema = pa.schema([("key", pa.int64()), ("value", pa.float64())])
+    budget = 8 * 1024
+    reducer = SpillingReducer(["key"], schema, memory_budget=budget, spill_dir=str(tmp_path))
+    rng = np.random.default_rng(0)
+    for _ in range(row_groups):
+        reducer.add(pd.DataFrame({"key": rng.permutation(keys), "value": rng.random(keys)}))
+    assert reducer.spilled
+
+    # Track the largest frame reduced while reading the spill files back.
+    peak = 0
+    reduce = SpillingReducer._reduce
+
+    def tracking_reduce(self, df):
+        nonlocal peak
+        peak = max(peak, len(df))
+        return reduce(self, df)
+
+    monkeypatch.setattr(SpillingReducer, "_reduce", tracking_reduce)
+    result = reducer.results()
+
+    assert sorted(result["key"]) == list(range(keys))
+    # Running state (about one budget) plus one read batch, far below
+    # the ~200,000 / partitions rows a whole-file read would hold.
+    batch_rows = max(int(budget // (4 * reducer.bytes_per_row)), 1024)
+    assert peak <= batch_rows + 2 * budget / reducer.bytes_per_row
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,142 @@
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from parquet_resoures import ParquetLoader
+from parquet_snapshots import CommitConflict, VersionedParquetTable
+
+
+def _records(ids, speed=1.0):
+    return [
+        {"id": int(i), "mmsi_no": 100000000 + int(i), "speed": speed, "timestamp_updated": "2024-01-01 00:00:00"}
+        for i in ids
+    ]
+
+
+def test_commit_conflict(tmp_path):
+    table = VersionedParquetTable(str(tmp_path / "t.parquet"))
+    data = pa.table({"id": [1]})
+    assert table.commit(data, 0) == 1
+    with pytest.raises(CommitConflict):
+        table.commit(data, 0)
+    assert table.versions() == [1]
+    assert not [name for name in os.listdir(table.versions_dir) if name.startswith(".tmp-")]
+
+
+def test_concurrent_upserts_retry_and_keep_all_rows(tmp_path):
+    path = str(tmp_path / "ships.parquet")
+    loaders = [ParquetLoader(path, versioned=True) for _ in range(4)]
+    for loader in loaders:
+        loader.max_commit_retries = 100
+    results = []
+
+    def write(loader, start):
+        for batch in range(5):
+            ids = range(start + batch * 10, start + batch * 10 + 10)
+            results.append(loader.upsert_data(path, _records(ids), ["id"], [], [], False))
+
+    threads = [threading.Thread(target=write, args=(loader, n * 1000)) for n, loader in enumerate(loaders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result["success"] for result in results)
+    table = loaders[0].versions(path)
+    assert table.latest_version() == 20
+    assert len(table.read().to_pandas()) == 200
+    assert len(pd.read_parquet(path)) == 200
+
+
+def test_pinned_snapshot_survives_commits_and_gc(tmp_path):
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path, versioned=True, keep_versions=1, retention_seconds=0)
+    loader.upsert_data(path, _records(range(10)), ["id"], [], [], False)
+
+    with loader.snapshot() as snapshot:
+        for n in range(1, 4):
+            loader.upsert_data(path, _records(range(10 * n, 10 * n + 10)), ["id"], [], [], False)
+        assert snapshot.version == 1
+        assert os.path.exists(snapshot.path)
+        assert len(pd.read_parquet(snapshot.path)) == 10
+        assert 1 in loader.versions(path).versions()
+
+    loader.vacuum()
+    assert loader.versions(path).versions() == [4]
+
+
+def test_external_write_to_head_is_adopted(tmp_path):
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path, versioned=True)
+    loader.upsert_data(path, _records(range(10)), ["id"], [], [], False)
+
+    # Another tool rewrites the plain file, e.g. `cli.py convert`.
+    pd.DataFrame(_records(range(100, 103), speed=9.0)).to_parquet(path, index=False)
+
+    table = loader.versions(path)
+    assert len(table.read().to_pandas()) == 3
+    assert table.latest_version() == 2
+
+    # The next upsert builds on the adopted version instead of overwriting it.
+    loader.upsert_data(path, _records([200]), ["id"], [], [], False)
+    assert sorted(pd.read_parquet(path)["id"]) == [100, 101, 102, 200]
+
+
+def test_default_is_unversioned(tmp_path):
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path)
+    loader.upsert_data(path, _records(range(10)), ["id"], [], [], False)
+    loader.upsert_data(path, _records(range(5, 15), speed=2.0), ["id"], [], [], False)
+
+    df = pd.read_parquet(path)
+    assert len(df) == 15
+    assert not os.path.exists(path + "_versions")
+    assert os.listdir(tmp_path) == ["ships.parquet"]
+
+
+def test_load_without_published_head(tmp_path):
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path, versioned=True, publish_head=False)
+    loader.upsert_data(path, _records(range(10)), ["id"], [], [], False)
+    assert not os.path.exists(path)
+
+    assert len(loader.load_data(None, None)) == 10
+    # A fresh loader finds the table through its versions directory.
+    assert len(ParquetLoader(path, versioned=True, publish_head=False).load_data(None, None)) == 10
+
+
+def test_gc_tolerates_tmp_file_removed_concurrently(tmp_path, monkeypatch):
+    table = VersionedParquetTable(str(tmp_path / "t.parquet"), retention_seconds=0)
+    table.commit(pa.table({"id": [1]}), 0)
+    tmp_file = os.path.join(table.versions_dir, ".tmp-abc.parquet")
+    open(tmp_file, "w").close()
+
+    getmtime = os.path.getmtime
+
+    def vanish(path):
+        # The writer removes its tmp file between listdir and getmtime.
+        if path == tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return getmtime(path)
+
+    monkeypatch.setattr(os.path, "getmtime", vanish)
+    assert table.gc() == []
+
+
+def test_failed_unversioned_write_leaves_no_tmp_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "ships.parquet")
+    loader = ParquetLoader(path)
+    loader.upsert_data(path, _records(range(10)), ["id"], [], [], False)
+
+    def fail(self, target, **kwargs):
+        open(target, "w").close()
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", fail)
+    with pytest.raises(OSError):
+        loader.upsert_data(path, _records(range(10, 20)), ["id"], [], [], False)
+    assert os.listdir(tmp_path) == ["ships.parquet"]
+    assert len(pd.read_parquet(path)) == 10
@@ -0,0 +1,76 @@
+import os
+import time
+
+import duckdb
+import sqlalchemy as sa
+
+from schema_catalog import SchemaCatalog
+
+
+def _sqlite_engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'ships.sqlite'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE ship_data (id INTEGER PRIMARY KEY, mmsi_no INTEGER, speed REAL)")
+        conn.exec_driver_sql("CREATE UNIQUE INDEX ux_mmsi ON ship_data (mmsi_no)")
+    return engine
+
+
+def test_describe_reflects_once_and_refreshes_on_schema_change(tmp_path, monkeypatch):
+    engine = _sqlite_engine(tmp_path)
+    catalog = SchemaCatalog()
+    entry = catalog.describe(engine, "ship_data")
+    assert catalog.columns(entry) == ["id", "mmsi_no", "speed"]
+    assert entry["primary_key"] == ["id"]
+    assert ["mmsi_no"] in entry["unique"]
+
+    inspections = []
+    monkeypatch.setattr(sa, "inspect", lambda bind: inspections.append(bind) or sa.inspection.inspect(bind))
+    assert catalog.describe(engine, "ship_data") is entry
+    assert not inspections
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE ship_data ADD COLUMN course REAL")
+    # A new process validates the snapshot against PRAGMA schema_version.
+    catalog.save(str(tmp_path / "catalog.json"))
+    reloaded = SchemaCatalog(str(tmp_path / "catalog.json"))
+    assert catalog.columns(reloaded.describe(engine, "ship_data")) == ["id", "mmsi_no", "speed", "course"]
+    assert len(inspections) == 1
+
+
+def test_snapshot_skips_reflection_while_schema_is_unchanged(tmp_path, monkeypatch):
+    engine = _sqlite_engine(tmp_path)
+    path = str(tmp_path / "catalog.json")
+    catalog = SchemaCatalog()
+    catalog.describe(engine, "ship_data")
+    catalog.save(path)
+
+    def fail(bind):
+        raise AssertionError("reflected a table present in the snapshot")
+
+    monkeypatch.setattr(sa, "inspect", fail)
+    table = SchemaCatalog(path).table(engine, "ship_data")
+    assert [column.name for column in table.columns] == ["id", "mmsi_no", "speed"]
+    assert table.c.id.primary_key
+
+
+def test_invalidate_and_lookup_of_other_backends(tmp_path):
+    catalog = SchemaCatalog()
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE ship_data (id INTEGER PRIMARY KEY, speed DOUBLE)")
+    entry = catalog.duckdb_describe(conn, ":memory:", "ship_data")
+    assert entry["columns"] == [["id", "INTEGER"], ["speed", "DOUBLE"]]
+    assert entry["primary_key"] == ["id"]
+
+    path = str(tmp_path / "ships.parquet")
+    conn.execute(f"COPY ship_data TO '{path}' (FORMAT PARQUET)")
+    assert catalog.columns(catalog.parquet_describe(path)) == ["id", "speed"]
+    conn.execute("ALTER TABLE ship_data ADD COLUMN course DOUBLE")
+    time.sleep(0.01)
+    conn.execute(f"COPY ship_data TO '{path}' (FORMAT PARQUET)")
+    os.utime(path, None)
+    assert catalog.columns(catalog.parquet_describe(path)) == ["id", "speed", "course"]
+
+    # DuckDB entries are trusted for the process until invalidated.
+    assert catalog.duckdb_describe(conn, ":memory:", "ship_data") is entry
+    catalog.invalidate("ship_data")
+    assert catalog.columns(catalog.duckdb_describe(conn, ":memory:", "ship_data")) == ["id", "speed", "course"]
@@ -0,0 +1,61 @@
+import pytest
+
+from Duckdb_resourcers import DuckDBLoader
+from sql_filters import filter_conditions
+
+
+@pytest.fixture
+def duckdb_loader(ship_frame):
+    loader = DuckDBLoader()
+    frame = ship_frame(100)
+    frame.loc[0, "name"] = "'quoted'"
+    loader.conn.execute("CREATE TABLE ship_data AS SELECT * FROM frame")
+    return loader
+
+
+def test_quoted_string_values_match_literally(duckdb_loader):
+    rows = duckdb_loader.load_data("ship_data", filters={"name": "'quoted'"})
+    assert [row["id"] for row in rows] == [1]
+    assert duckdb_loader.load_data("ship_data", filters={"name": "quoted"}) == []
+
+
+def test_filter_values_cannot_inject_sql(duckdb_loader):
+    rows = duckdb_loader.load_data("ship_data", filters={"name": "' OR '1'='1"})
+    assert rows == []
+    rows = duckdb_loader.load_data("ship_data", filters={"cargo_type": ["Bulk", "x') OR (1=1"]})
+    assert {row["cargo_type"] for row in rows} == {"Bulk"}
+
+
+def test_filters_apply_before_only_latest(duckdb_loader):
+    rows = duckdb_loader.load_data(
+        "ship_data", filters={"cargo_type": "Tanker"},
+        only_latest={"latest_on": "mmsi_no", "timestamp_column": "timestamp_updated"},
+    )
+    assert rows and {row["cargo_type"] for row in rows} == {"Tanker"}
+
+
+def test_filter_conditions_bind_every_value():
+    conditions, params = filter_conditions({"a": 1, "b": [2, 3], "c": {">=": 4, "<": 5}})
+    assert conditions == ['"a" = ?', '"b" IN (?, ?)', '"c" >= ?', '"c" < ?']
+    assert params == [1, 2, 3, 4, 5]
+    with pytest.raises(ValueError):
+        filter_conditions({"a": {"~": 1}})
+
+
+
+def test_duckdb_partitions_bind_their_bounds(duckdb_loader):
+    clause, params = DuckDBLoader._partition_clause({"column": "id", "lower": 10, "upper": 20})
+    assert clause == '"id" >= ? AND "id" < ?'
+    assert params == [10, 20]
+    clause, params = DuckDBLoader._partition_clause({"column": "mmsi_no", "modulus": 4, "remainder": 1})
+    assert params == [4, 1]
+
+    rows = duckdb_loader.load_data(
+        "ship_data", filters={"speed": {">": 5}}, partition={"column": "id", "lower": 10, "upper": "20"},
+    )
+    assert rows and all(10 <= row["id"] < 20 and row["speed"] > 5 for row in rows)
+    hashed = [
+        len(duckdb_loader.load_data("ship_data", partition={"column": "mmsi_no", "modulus": 3, "remainder": r}))
+        for r in range(3)
+    ]
+    assert sum(hashed) == 100
@@ -0,0 +1,25 @@
+import numpy as np
+
+from trajectory_store import TrajectoryStore
+
+
+def _record(mmsi, timestamp, speed):
+    return {"mmsi_no": mmsi, "timestamp_updated": timestamp, "latitude": 1.0, "longitude": 2.0, "speed": speed, "course": 0.0}
+
+
+def test_duplicate_timestamps_within_a_batch_keep_the_last():
+    store = TrajectoryStore()
+    store.append([_record(1, "2024-01-01 00:00:00", 5.0), _record(1, "2024-01-01 00:00:00", 7.0)])
+    assert len(store.query(1)["speed"]) == 1
+    assert store.latest(1)["speed"] == 7.0
+
+    # Append-only path: the batch extends the track but repeats its own timestamp.
+    store.append([_record(1, "2024-01-01 01:00:00", 8.0), _record(1, "2024-01-01 01:00:00", 9.0)])
+    np.testing.assert_array_equal(store.query(1)["speed"], [7.0, 9.0])
+
+
+def test_append_replaces_stored_position():
+    store = TrajectoryStore()
+    store.append([_record(1, "2024-01-01 00:00:00", 5.0), _record(1, "2024-01-01 02:00:00", 6.0)])
+    store.append([_record(1, "2024-01-01 00:00:00", 1.0)])
+    np.testing.assert_array_equal(store.query(1)["speed"], [1.0, 6.0])
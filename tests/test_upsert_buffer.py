@@ -0,0 +1,127 @@
+import time
+
+from parquet_resoures import ParquetLoader
+from upsert_buffer import BufferedUpserter
+
+
+def test_buffered_update_hides_backend_row_that_it_moves_out_of_the_filter(parquet_table, ship_frame):
+    frame = ship_frame(20)
+    path = parquet_table(frame)
+    loader = ParquetLoader(path)
+    buffer = BufferedUpserter(loader, path, ["id"], background=False)
+
+    row = frame.iloc[1].to_dict()
+    cargo_type = row["cargo_type"]
+    buffer.add(dict(row, cargo_type="ZZZ", timestamp_updated="2030-01-01 00:00:00"))
+
+    rows = buffer.load_data(model="ships", selected_columns_or_path=None, filters={"cargo_type": cargo_type})
+    assert row["id"] not in [r["id"] for r in rows]
+    assert len(rows) == (frame["cargo_type"] == cargo_type).sum() - 1
+
+    moved = buffer.load_data(model="ships", selected_columns_or_path=None, filters={"cargo_type": "ZZZ"})
+    assert [r["id"] for r in moved] == [row["id"]]
+
+
+class RecordingLoader:
+    """Stands in for a backend; keeps the batches it receives and can fail on demand."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = False
+
+    def upsert_data(self, model, data, id_fields, unique_fields, no_update_cols, return_counts):
+        if self.fail:
+            return {"success": False, "message": "backend down"}
+        self.batches.append(data)
+        return {"success": True, "inserted_rows": len(data), "updated_rows": 0}
+
+
+def _record(i, timestamp="2024-01-01 00:00:00", **values):
+    return dict({"id": i, "mmsi_no": 100000000 + i, "cargo_type": "Bulk", "timestamp_updated": timestamp}, **values)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_buffered_record_older_than_backend_row_outside_filter_is_hidden(parquet_table, ship_frame):
+    frame = ship_frame(20)
+    path = parquet_table(frame)
+    buffer = BufferedUpserter(ParquetLoader(path), path, ["id"], background=False)
+
+    # The backend row has moved to another cargo type since this stale record was buffered.
+    row = frame.iloc[1].to_dict()
+    other = next(cargo for cargo in ("Bulk", "Container", "General", "Tanker") if cargo != row["cargo_type"])
+    buffer.add(dict(row, cargo_type=other, timestamp_updated="2000-01-01 00:00:00"))
+
+    rows = buffer.load_data(model="ships", selected_columns_or_path=None, filters={"cargo_type": other})
+    assert row["id"] not in [r["id"] for r in rows]
+    assert len(rows) == (frame["cargo_type"] == other).sum()
+
+    # A key the backend does not have is still overlaid.
+    buffer.add(_record(999, cargo_type=other))
+    rows = buffer.load_data(model="ships", selected_columns_or_path=None, filters={"cargo_type": other})
+    assert 999 in [r["id"] for r in rows]
+
+
+def test_size_trigger_flushes_inline_without_thread():
+    loader = RecordingLoader()
+    buffer = BufferedUpserter(loader, "ships", ["id"], max_records=3, max_age=60, background=False)
+    buffer.add_many([_record(1), _record(2)])
+    buffer.add(_record(1, timestamp="2024-01-01 01:00:00"))
+    assert loader.batches == []
+    assert buffer.stats["coalesced"] == 1
+
+    buffer.add(_record(3))
+    assert [sorted(r["id"] for r in batch) for batch in loader.batches] == [[1, 2, 3]]
+    assert buffer.pending() == []
+
+
+def test_background_thread_flushes_on_size_and_age():
+    loader = RecordingLoader()
+    with BufferedUpserter(loader, "ships", ["id"], max_records=5, max_age=60) as buffer:
+        buffer.add_many([_record(i) for i in range(5)])
+        _wait_for(lambda: len(loader.batches) == 1)
+        assert len(loader.batches[0]) == 5
+
+    loader = RecordingLoader()
+    with BufferedUpserter(loader, "ships", ["id"], max_records=1000, max_age=0.05) as buffer:
+        buffer.add(_record(1))
+        _wait_for(lambda: len(loader.batches) == 1)
+        assert buffer.stats["flushes"] == 1
+
+
+def test_failed_flush_keeps_records_and_newer_updates():
+    loader = RecordingLoader()
+    buffer = BufferedUpserter(loader, "ships", ["id"], background=False)
+    buffer.add(_record(1))
+    loader.fail = True
+    assert not buffer.flush()["success"]
+    buffer.add(_record(1, timestamp="2024-01-02 00:00:00"))
+    assert buffer.get(1)["timestamp_updated"] == "2024-01-02 00:00:00"
+
+    loader.fail = False
+    assert buffer.flush()["success"]
+    assert loader.batches == [[_record(1, timestamp="2024-01-02 00:00:00")]]
+    assert buffer.stats["failed_flushes"] == 1
+
+
+def test_log_is_replayed_after_crash(tmp_path):
+    log_path = str(tmp_path / "buffer.log")
+    crashed = BufferedUpserter(RecordingLoader(), "ships", ["id"], background=False, durability="log", log_path=log_path)
+    crashed.add_many([_record(1), _record(2), _record(1, timestamp="2024-01-01 01:00:00")])
+    # The process dies here: no flush, no close.
+    del crashed
+
+    loader = RecordingLoader()
+    buffer = BufferedUpserter(loader, "ships", ["id"], background=False, durability="log", log_path=log_path)
+    assert sorted((r["id"], r["timestamp_updated"]) for r in buffer.pending()) == [
+        (1, "2024-01-01 01:00:00"), (2, "2024-01-01 00:00:00"),
+    ]
+    assert buffer.flush()["success"]
+    assert len(loader.batches[0]) == 2
+    buffer.close()
+    assert open(log_path).read() == ""
@@ -0,0 +1,183 @@
+import os
+import threading
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+class TrajectoryStore:
+    """
+    Per-vessel positions held as contiguous NumPy arrays sorted by timestamp.
+
+    Each vessel maps to one array per column. Time-range queries binary-search
+    the timestamp array and return views, so they cost O(log n + k) and create
+    no per-row Python objects.
+    """
+
+    def __init__(
+        self,
+        key_column: str = "mmsi_no",
+        time_column: str = "timestamp_updated",
+        value_columns: Sequence[str] = ("latitude", "longitude", "speed", "course"),
+    ):
+        self.key_column = key_column
+        self.time_column = time_column
+        self.value_columns = list(value_columns)
+        self.vessels: Dict[Any, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_loader(cls, loader, model: Any, store_kwargs: dict = None, **load_kwargs) -> "TrajectoryStore":
+        """
+        Build a store from any loader's `load_data` output.
+
+        :param loader: Loader to read from
+        :param model: Table (or table name) passed to `load_data`
+        :param store_kwargs: Column configuration forwarded to the constructor
+        :param load_kwargs: Remaining `load_data` arguments
+        """
+        store = cls(**(store_kwargs or {}))
+        store.append(loader.load_data(model=model, **load_kwargs))
+        return store
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.time_column] + self.value_columns
+
+    def _to_columns(self, records) -> Dict[str, np.ndarray]:
+        if hasattr(records, "columns"):
+            # pandas DataFrame
+            columns = {col: records[col].to_numpy() for col in [self.key_column] + self.columns}
+        else:
+            columns = {
+                col: np.array([record.get(col) for record in records])
+                for col in [self.key_column] + self.columns
+            }
+        columns[self.time_column] = columns[self.time_column].astype("datetime64[ns]")
+        for col in self.value_columns:
+            columns[col] = columns[col].astype(np.float64)
+        return columns
+
+    def append(self, records) -> int:
+        """
+        Merge a batch of records (list of dictionaries or DataFrame) into the store.
+
+        A record with the same vessel and timestamp as a stored position replaces it.
+
+        :return: Number of vessels touched
+        """
+        if records is None or len(records) == 0:
+            return 0
+
+        columns = self._to_columns(records)
+        keys = columns.pop(self.key_column)
+        order = np.lexsort((columns[self.time_column], keys))
+        keys = keys[order]
+        columns = {col: values[order] for col, values in columns.items()}
+
+        # lexsort is stable, so the last record of a repeated (vessel, timestamp) wins.
+        timestamps = columns[self.time_column]
+        keep = np.append((keys[1:] != keys[:-1]) | (timestamps[1:] != timestamps[:-1]), True)
+        keys = keys[keep]
+        columns = {col: values[keep] for col, values in columns.items()}
+
+        boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(keys)]))
+
+        with self._lock:
+            for start, end in zip(starts, ends):
+                key = keys[start].item()
+                batch = {col: values[start:end] for col, values in columns.items()}
+                existing = self.vessels.get(key)
+                self.vessels[key] = batch if existing is None else self._merge(existing, batch)
+        return len(starts)
+
+    def _merge(self, existing: Dict[str, np.ndarray], batch: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        existing_ts = existing[self.time_column]
+        batch_ts = batch[self.time_column]
+        if len(existing_ts) and batch_ts[0] > existing_ts[-1]:
+            # Common live-stream case: the batch extends the track.
+            return {col: np.concatenate((existing[col], batch[col])) for col in self.columns}
+
+        merged = {col: np.concatenate((existing[col], batch[col])) for col in self.columns}
+        order = np.argsort(merged[self.time_column], kind="stable")
+        merged = {col: values[order] for col, values in merged.items()}
+        timestamps = merged[self.time_column]
+        # Keep the last occurrence of each timestamp; the stable sort puts batch rows last.
+        keep = np.append(timestamps[1:] != timestamps[:-1], True)
+        return {col: values[keep] for col, values in merged.items()}
+
+    def upsert(self, loader, model: Any, data: List[Dict[str, Any]], **upsert_kwargs) -> Dict[str, Any]:
+        """Call `loader.upsert_data` and append the batch to the store on success."""
+        result = loader.upsert_data(model, data, **upsert_kwargs)
+        if result.get("success"):
+            self.append(data)
+        return result
+
+    def query(self, key: Any, start: Any = None, end: Any = None) -> Dict[str, np.ndarray]:
+        """
+        Return positions of vessel `key` with `start <= timestamp <= end`.
+
+        :return: Dictionary of column name to array view; empty arrays if the vessel is unknown
+        """
+        arrays = self.vessels.get(key)
+        if arrays is None:
+            return {
+                col: np.empty(0, dtype="datetime64[ns]" if col == self.time_column else np.float64)
+                for col in self.columns
+            }
+
+        timestamps = arrays[self.time_column]
+        lo = 0 if start is None else np.searchsorted(timestamps, np.datetime64(start, "ns"), side="left")
+        hi = len(timestamps) if end is None else np.searchsorted(timestamps, np.datetime64(end, "ns"), side="right")
+        return {col: values[lo:hi] for col, values in arrays.items()}
+
+    def latest(self, key: Any) -> Dict[str, Any]:
+        """Return the most recent position of vessel `key`, or None."""
+        arrays = self.vessels.get(key)
+        if arrays is None or not len(arrays[self.time_column]):
+            return None
+        return {col: values[-1] for col, values in arrays.items()}
+
+    def __len__(self) -> int:
+        return len(self.vessels)
+
+    def save(self, directory: str):
+        """
+        Persist the store as one `.npy` file per column plus vessel keys and offsets.
+
+        Rows are laid out vessel by vessel, so each vessel is a contiguous slice.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            keys = list(self.vessels.keys())
+            lengths = [len(self.vessels[key][self.time_column]) for key in keys]
+            offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+            np.save(os.path.join(directory, "keys.npy"), np.array(keys))
+            np.save(os.path.join(directory, "offsets.npy"), offsets)
+            for col in self.columns:
+                if keys:
+                    values = np.concatenate([self.vessels[key][col] for key in keys])
+                else:
+                    values = np.empty(0, dtype="datetime64[ns]" if col == self.time_column else np.float64)
+                np.save(os.path.join(directory, f"{col}.npy"), values)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, **store_kwargs) -> "TrajectoryStore":
+        """
+        Open a store written by `save`. With `mmap`, vessel arrays are read-only
+        views into memory-mapped files; appending copies only the vessels it touches.
+        """
+        store = cls(**store_kwargs)
+        mmap_mode = "r" if mmap else None
+        keys = np.load(os.path.join(directory, "keys.npy"))
+        offsets = np.load(os.path.join(directory, "offsets.npy"))
+        columns = {
+            col: np.load(os.path.join(directory, f"{col}.npy"), mmap_mode=mmap_mode)
+            for col in store.columns
+        }
+        for i, key in enumerate(keys.tolist()):
+            start, end = offsets[i], offsets[i + 1]
+            store.vessels[key] = {col: values[start:end] for col, values in columns.items()}
+        return store
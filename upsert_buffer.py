@@ -0,0 +1,334 @@
+import json
+import operator
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+class BufferedUpserter:
+    """
+    Micro-batching writer in front of any loader's `upsert_data`.
+
+    Records are coalesced per key in memory (newest `timestamp_updated` wins)
+    and written in one `upsert_data` call when the buffer reaches `max_records`,
+    when its oldest record is `max_age` seconds old, or on `flush()`.
+    """
+
+    def __init__(
+        self,
+        loader,
+        model: Any,
+        id_fields: List[str],
+        unique_fields: List[str] = None,
+        no_update_cols: List[str] = None,
+        max_records: int = 1000,
+        max_age: float = 1.0,
+        background: bool = True,
+        durability: str = "none",
+        log_path: Optional[str] = None,
+        fsync: bool = True,
+        timestamp_column: str = "timestamp_updated",
+    ):
+        """
+        :param loader: Loader whose `upsert_data` receives the batches
+        :param model: Table (or Parquet path) passed to `upsert_data`
+        :param id_fields: Key columns; records are coalesced on `id_fields + unique_fields`
+        :param max_records: Flush once this many distinct keys are buffered
+        :param max_age: Flush once the oldest buffered record is this many seconds old
+        :param background: Run a thread that flushes on size and age
+        :param durability: "none" keeps records in memory only; "log" appends each
+            record to `log_path` before `add` returns and replays it on start
+        :param fsync: With "log", fsync the log after every append
+        """
+        if durability not in ("none", "log"):
+            raise ValueError(f"Unsupported durability: {durability}")
+        if durability == "log" and not log_path:
+            raise ValueError("durability='log' requires log_path")
+
+        self.loader = loader
+        self.model = model
+        self.id_fields = list(id_fields)
+        self.unique_fields = list(unique_fields or [])
+        self.no_update_cols = no_update_cols or []
+        self.max_records = max_records
+        self.max_age = max_age
+        self.durability = durability
+        self.log_path = log_path
+        self.fsync = fsync
+        self.timestamp_column = timestamp_column
+
+        self._buffer: Dict[tuple, Dict[str, Any]] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        self._log = None
+        self.stats = {"added": 0, "coalesced": 0, "flushes": 0, "flushed_records": 0, "failed_flushes": 0}
+
+        if durability == "log":
+            self._replay_log()
+            self._log = open(log_path, "a", encoding="utf-8")
+
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="upsert-buffer-flush", daemon=True)
+            self._thread.start()
+
+    def _key(self, record: Dict[str, Any]) -> tuple:
+        return tuple(record[col] for col in self.id_fields + self.unique_fields)
+
+    def _coalesce(self, record: Dict[str, Any]):
+        key = self._key(record)
+        current = self._buffer.get(key)
+        if current is not None:
+            self.stats["coalesced"] += 1
+            if _as_datetime(record[self.timestamp_column]) < _as_datetime(current[self.timestamp_column]):
+                return
+        self._buffer[key] = record
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8") as log:
+            for line in log:
+                line = line.strip()
+                if line:
+                    self._coalesce(json.loads(line))
+        if self._buffer:
+            self._oldest = time.monotonic()
+
+    def add(self, record: Dict[str, Any]):
+        """Buffer one record."""
+        self.add_many([record])
+
+    def add_many(self, records: List[Dict[str, Any]]):
+        """Buffer a list of records, flushing inline if the buffer is full and no thread runs."""
+        if self._closed:
+            raise RuntimeError("BufferedUpserter is closed")
+
+        with self._lock:
+            if self._log is not None:
+                for record in records:
+                    self._log.write(json.dumps(record, default=str) + "\n")
+                self._log.flush()
+                if self.fsync:
+                    os.fsync(self._log.fileno())
+            for record in records:
+                self._coalesce(dict(record))
+            self.stats["added"] += len(records)
+            if self._oldest is None and self._buffer:
+                self._oldest = time.monotonic()
+            full = len(self._buffer) >= self.max_records
+            if full:
+                self._wakeup.notify()
+
+        if full and self._thread is None:
+            self.flush()
+
+    def _due(self) -> bool:
+        if not self._buffer:
+            return False
+        if len(self._buffer) >= self.max_records:
+            return True
+        return time.monotonic() - self._oldest >= self.max_age
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._closed and not self._due():
+                    timeout = None
+                    if self._oldest is not None:
+                        timeout = max(self.max_age - (time.monotonic() - self._oldest), 0)
+                    self._wakeup.wait(timeout if timeout is not None else self.max_age)
+                if self._closed:
+                    return
+            if not self.flush().get("success"):
+                # Back off instead of retrying a failing backend in a tight loop.
+                with self._lock:
+                    self._wakeup.wait(self.max_age)
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Write all buffered records in one `upsert_data` call.
+
+        On failure the records go back into the buffer (without overriding newer
+        ones buffered meanwhile) and the loader's result is returned.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return {"success": True, "message": "Nothing to flush", "inserted_rows": 0, "updated_rows": 0}
+                batch = list(self._buffer.values())
+                self._buffer = {}
+                self._oldest = None
+
+            try:
+                result = self.loader.upsert_data(
+                    self.model, [dict(record) for record in batch], self.id_fields,
+                    self.unique_fields, self.no_update_cols, True,
+                )
+            except Exception as e:
+                result = {"success": False, "message": str(e), "inserted_rows": 0, "updated_rows": 0}
+
+            with self._lock:
+                if result.get("success"):
+                    self.stats["flushes"] += 1
+                    self.stats["flushed_records"] += len(batch)
+                    self._rewrite_log()
+                else:
+                    self.stats["failed_flushes"] += 1
+                    pending = self._buffer
+                    self._buffer = {}
+                    for record in batch:
+                        self._coalesce(record)
+                    for record in pending.values():
+                        self._coalesce(record)
+                    if self._buffer and self._oldest is None:
+                        self._oldest = time.monotonic()
+            return result
+
+    def _rewrite_log(self):
+        """Truncate the log to the records still buffered. Called with `_lock` held."""
+        if self._log is None:
+            return
+        self._log.close()
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as log:
+            for record in self._buffer.values():
+                log.write(json.dumps(record, default=str) + "\n")
+            log.flush()
+            if self.fsync:
+                os.fsync(log.fileno())
+        os.replace(tmp_path, self.log_path)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Return a copy of the unflushed records."""
+        with self._lock:
+            return [dict(record) for record in self._buffer.values()]
+
+    def get(self, *key) -> Optional[Dict[str, Any]]:
+        """Return the unflushed record for a key (values of `id_fields + unique_fields`), if any."""
+        with self._lock:
+            record = self._buffer.get(tuple(key))
+            return dict(record) if record is not None else None
+
+    def load_data(self, **load_kwargs) -> List[Dict[str, Any]]:
+        """
+        Read through the loader with unflushed records overlaid.
+
+        Plain scans with equality/list `filters` overlay the buffer by key.
+        Queries that aggregate or reshape rows (`group_by`, `time_bucket`,
+        `only_latest`, `distinct`, selected columns, `limit`/`offset`) flush
+        first so the backend sees every record.
+        """
+        reshaping = [
+            arg for arg in ("group_by", "time_bucket", "only_latest", "distinct", "limit", "offset")
+            if load_kwargs.get(arg)
+        ]
+        # ParquetLoader takes its table path in `selected_columns_or_path`.
+        columns = load_kwargs.get("selected_columns_or_path")
+        if reshaping or (columns and not isinstance(columns, str)):
+            self.flush()
+            return self.loader.load_data(**load_kwargs)
+
+        rows = self.loader.load_data(**load_kwargs)
+        overlay = self.pending()
+        filters = load_kwargs.get("filters") or {}
+
+        def matches(record):
+            for column, value in filters.items():
+                if isinstance(value, list):
+                    if record.get(column) not in value:
+                        return False
+                elif isinstance(value, dict):
+                    for op, val in value.items():
+                        if not _OPERATORS[op](record.get(column), val):
+                            return False
+                elif record.get(column) != value:
+                    return False
+            return True
+
+        # Key every buffered record, matching or not: a newer buffered record
+        # that no longer matches `filters` must still hide the backend row.
+        buffered = {self._key(record): record for record in overlay}
+        merged = []
+        for row in rows:
+            key = tuple(row.get(col) for col in self.id_fields + self.unique_fields)
+            record = buffered.pop(key, None)
+            if record is not None and _as_datetime(record[self.timestamp_column]) >= _as_datetime(row.get(self.timestamp_column)):
+                if matches(record):
+                    merged.append(record)
+            else:
+                merged.append(row)
+        # Buffered records the filtered scan did not return may still be older
+        # than the backend's row for their key, which the filter excluded.
+        inserts = [record for record in buffered.values() if matches(record)]
+        if inserts:
+            backend = self._backend_timestamps(load_kwargs, inserts)
+            inserts = [
+                record for record in inserts
+                if self._key(record) not in backend
+                or _as_datetime(record[self.timestamp_column]) >= backend[self._key(record)]
+            ]
+        merged.extend(inserts)
+
+        order_by = load_kwargs.get("order_by")
+        if order_by:
+            merged.sort(
+                key=lambda row: (row.get(order_by) is None, row.get(order_by)),
+                reverse=(load_kwargs.get("order") or "asc").lower() == "desc",
+            )
+        return merged
+
+    def _backend_timestamps(self, load_kwargs: Dict[str, Any], records: List[Dict[str, Any]]) -> Dict[tuple, Any]:
+        """Return the backend's newest timestamp for each key of `records`."""
+        key_columns = self.id_fields + self.unique_fields
+        keys = {self._key(record) for record in records}
+        filters = {col: sorted({key[i] for key in keys}, key=str) for i, col in enumerate(key_columns)}
+        rows = self.loader.load_data(**dict(load_kwargs, filters=filters, order_by=None))
+        timestamps = {}
+        for row in rows:
+            key = tuple(row.get(col) for col in key_columns)
+            if key in keys:
+                timestamp = _as_datetime(row.get(self.timestamp_column))
+                if key not in timestamps or timestamp > timestamps[key]:
+                    timestamps[key] = timestamp
+        return timestamps
+
+    def close(self):
+        """Stop the background thread and flush what is left."""
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()